@@ -49,8 +49,8 @@ function! ctrlp#cmdsolvent#init()
     "     autocmd BufEnter ControlP call matchadd("MyGroup", "Eons")
     " augroup END
 
-    " Build the list of items in python
-    " TODO: cache this list to make it faster in large projects
+    " Get the list of items from python, it's only built again when the
+    " projects change
     return pyeval('Solvent.GetCtrlPFileList()')
 endfunction
 
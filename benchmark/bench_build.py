@@ -0,0 +1,52 @@
+"""Runs a build with the fake backend (see FakeBackend) as fast as it can go
+and times the whole pipeline: the logger's output goes through a pipe to the
+_FileMonitor threads, is decoded into BuildEvents, queued and added to the
+OutputView and the quickfix list by Builder.UpdateAsync.
+
+    python benchmark/bench_build.py [events] [rate]
+"""
+import os.path
+import sys
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, "..", "plugin"))
+sys.path.insert(0, os.path.join(here, "stub"))
+
+import vim
+from vimutil import VimUtil
+from builder import Builder
+from solventcore.buildevent import EventTypes
+
+class _Option:
+    def GetSelected(self):
+        return "Debug"
+
+class _Solution:
+    absolutePath = os.path.join(here, "bench.sln")
+    configuration = _Option()
+    platform = _Option()
+
+if __name__ == "__main__":
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rate = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    vim.vars["solvent_wakeup"] = "timer"    # Nothing calls UpdateAsync here
+    vim.vars["solvent_build_backend"] = "fake"
+    vim.vars["solvent_fake_build_events"] = events
+    vim.vars["solvent_fake_build_rate"] = rate
+    vim.vars["solvent_build_logs"] = 0
+    VimUtil.Init()
+    vim.current.buffer.name = "solvent-output"
+
+    builder = Builder(_Solution())
+    vim.crossings = 0
+    start = time.time()
+    builder.Build()
+    while builder.IsRunning():
+        builder.UpdateAsync()
+        time.sleep(0.01)    # Roughly how often vim would get to it
+    elapsed = time.time() - start
+    print "%d events in %.3fs (%d events/s), %d errors, %d warnings, %d calls into vim" % (
+        len(builder.buildevents), elapsed, len(builder.buildevents) / elapsed,
+        builder.buildevents.Count(EventTypes.BuildError), builder.buildevents.Count(EventTypes.BuildWarning), vim.crossings)
@@ -0,0 +1,65 @@
+"""Times the FileIndex behind :SolventFind on a synthetic solution of about
+200k files: building the index, typing a few queries one character at a
+time (what happens on every keystroke) and indexing again a project that
+was reloaded.
+
+    python benchmark/bench_find.py [projects] [files per project]
+"""
+import os.path
+import random
+import sys
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, "..", "plugin"))
+
+from solventcore.tree import File
+from solventcore.fileindex import FileIndex
+
+_words = ["source", "include", "engine", "render", "core", "utils", "network", "audio",
+          "physics", "interface", "platform", "windows", "shaders", "tests", "tools", "math"]
+
+class _Project:
+    def __init__(self, id, files):
+        self.id = id
+        self.generation = 1
+        self.files = files
+
+class _Solution:
+    def __init__(self, projects):
+        self.projects = projects
+        self.generation = 1
+
+def CreateFiles(project, count):
+    files = []
+    for i in range(0, count):
+        folders = [random.choice(_words) for j in range(0, random.randint(1, 4))]
+        name = random.choice(_words) + random.choice(_words).capitalize() + str(i)
+        files.append(File(None, "\\".join(folders) + "\\" + name + random.choice([".cpp", ".h"])))
+    return files
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    random.seed(0)
+    solution = _Solution([_Project(i, CreateFiles(i, files)) for i in range(0, count)])
+
+    index = FileIndex()
+    start = time.time()
+    index.Update(solution)
+    print "index %d files: %.3fs" % (count * files, time.time() - start)
+
+    for query in ("renderinterface", "shaders/math", "netaudio12"):
+        times = []
+        for i in range(1, len(query) + 1):
+            start = time.time()
+            index.Find(query[:i], 20)
+            times.append(time.time() - start)
+        print "typing %-16s first key %.3fs, slowest key %.3fs, total %.3fs" % (query, times[0], max(times), sum(times))
+
+    project = solution.projects[count / 2]
+    project.files = CreateFiles(project.id, files)
+    project.generation = solution.generation = 2
+    start = time.time()
+    index.Update(solution)
+    print "reindex a project: %.3fs" % (time.time() - start)
@@ -0,0 +1,43 @@
+"""Measures how many events per second BuildEventDecoder gets out of logger
+output, for pretty printed objects and for one object per line (NDJSON),
+with some of msbuild's own lines mixed in. Messages get bigger on each run,
+the time per event should grow with the size of the message, not faster.
+
+    python benchmark/bench_framing.py [events]
+"""
+import json
+import os.path
+import sys
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, "..", "plugin"))
+
+from solventcore.buildevent import BuildEventDecoder
+
+def CreateOutput(events, messageLines, indent):
+    lines = []
+    message = "\n".join(["some message line that is somewhat long"] * messageLines)
+    for i in range(0, events):
+        if i % 100 == 0:
+            lines.append("Building the projects in this solution one at a time.\n")
+        values = {"type": "BuildMessage", "timestamp": "12:00:00", "importance": "High", "message": message}
+        lines.extend((json.dumps(values, indent=indent) + "\n").splitlines(True))
+    return lines
+
+def Measure(lines):
+    decoder = BuildEventDecoder()
+    count = 0
+    start = time.time()
+    for line in lines:
+        count += len(decoder.Feed(line))
+    count += len(decoder.Flush())
+    return count, time.time() - start
+
+if __name__ == "__main__":
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    for name, indent in (("pretty", 2), ("ndjson", None)):
+        for messageLines in (1, 10, 100):
+            count, elapsed = Measure(CreateOutput(events, messageLines, indent))
+            print "%s, %3d line messages: %6d events in %.3fs (%d events/s)" % (name, messageLines, count, elapsed, count / elapsed)
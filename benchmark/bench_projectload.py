@@ -0,0 +1,42 @@
+"""Times building the tree of a project (Project.Load) from already read
+contents for an increasing number of files. Half of the files go straight
+into a wide filter and the other half into a few filters nested in it that
+show up one after another, so finding the nested filters means looking
+through a lot of siblings. The
+time per file should stay flat as the project grows.
+
+    python benchmark/bench_projectload.py [filters]
+"""
+import os.path
+import sys
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, "..", "plugin"))
+
+from solventcore.project import ProjectDef, ProjectContents, Project
+
+class _Solution:
+    solutionDir = ""
+    generation = 0
+
+def CreateContents(files, filters):
+    contents = ProjectContents()
+    for i in range(0, files):
+        if i % 2:
+            filter = "Source Files"
+        else:
+            filter = "Source Files\\group%d" % (i * filters / files)
+        contents.items.append(("src\\file%d.cpp" % i, filter))
+    return contents
+
+if __name__ == "__main__":
+    filters = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+
+    definition = ProjectDef(_Solution(), "{8BC9CEB8-8B4A-11D0-8D11-00A0C91BC942}", "bench", "bench.vcxproj", "{0}")
+    for files in (5000, 10000, 20000, 40000):
+        contents = CreateContents(files, filters)
+        start = time.time()
+        Project(definition, contents)
+        elapsed = time.time() - start
+        print "%6d files: %.3fs (%.2fus per file)" % (files, elapsed, elapsed / files * 1e6)
@@ -0,0 +1,46 @@
+"""Times SolutionView.Render on a synthetic tree of about 100k nodes.
+
+    python benchmark/bench_render.py [folders] [files per folder]
+"""
+import os.path
+import sys
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, "..", "plugin"))
+sys.path.insert(0, os.path.join(here, "stub"))
+
+import vim
+from vimutil import VimUtil
+from solventcore.tree import Folder, File
+from solutionview import SolutionView
+
+def CreateTree(folders, files):
+    root = Folder("root")
+    for i in range(0, folders):
+        folder = Folder("folder%d" % i)
+        root.AddChild(folder)
+        for j in range(0, files):
+            folder.AddChild(File(None, "src\\folder%d\\file%d.cpp" % (i, j)))
+    return root
+
+def Measure(view):
+    view.buffer = vim.current.buffer
+    view.window = vim.current.window
+    vim.crossings = 0
+    start = time.time()
+    view.Render()
+    return time.time() - start, vim.crossings
+
+if __name__ == "__main__":
+    folders = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    files = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    VimUtil.Init()
+    root = CreateTree(folders, files)
+    print "%d nodes" % (1 + folders * (files + 1))
+    for virtual in (False, True):
+        vim.vars["solvent_virtual_render"] = int(virtual)
+        view = SolutionView(root)
+        elapsed, crossings = Measure(view)
+        print "%-8s render: %.3fs, %d calls into vim" % ("virtual" if virtual else "full", elapsed, crossings)
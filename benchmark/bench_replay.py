@@ -0,0 +1,60 @@
+"""Replays a synthetic build log at full speed through the Builder and the
+OutputView, which is the same path the events of a real build take once
+they're read from msbuild, and reports the events per second that make it
+into the output buffer.
+
+    python benchmark/bench_replay.py [events]
+"""
+import os
+import os.path
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, "..", "plugin"))
+sys.path.insert(0, os.path.join(here, "stub"))
+
+import vim
+from vimutil import VimUtil
+from solventcore.buildevent import BuildEvent
+from solventcore.buildlog import BuildLog
+from builder import Builder
+
+def CreateLog(path, events):
+    log = BuildLog(path, "build")
+    batch = []
+    for i in range(0, events):
+        if i % 50 == 0:
+            values = {"type": "BuildWarning", "timestamp": "12:00:00", "message": "warning %d" % i}
+        else:
+            values = {"type": "BuildMessage", "timestamp": "12:00:00", "importance": "High", "message": "message %d" % i}
+        batch.append(BuildEvent.FromValues(values))
+        if len(batch) == 100:
+            log.Write(batch)
+            batch = []
+    log.Write(batch)
+    log.Close()
+
+if __name__ == "__main__":
+    events = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    vim.vars["solvent_wakeup"] = "timer"    # Nothing calls UpdateAsync here
+    VimUtil.Init()
+    vim.current.buffer.name = "solvent-output"
+
+    handle, path = tempfile.mkstemp(suffix=".log")
+    os.close(handle)
+    try:
+        CreateLog(path, events)
+        builder = Builder(None)
+        vim.crossings = 0
+        start = time.time()
+        builder.Replay(path)
+        while builder.replay.thread.is_alive() or not builder.outputqueue.empty():
+            builder.UpdateAsync()
+        elapsed = time.time() - start
+        print "%d events in %.3fs (%d events/s), %d lines, %d calls into vim" % (
+            len(builder.buildevents), elapsed, len(builder.buildevents) / elapsed, len(vim.current.buffer), vim.crossings)
+    finally:
+        os.remove(path)
@@ -0,0 +1,197 @@
+"""Writes a synthetic solution to benchmark with: a .sln and a .vcxproj and
+.vcxproj.filters per project, in the format Visual Studio 2010 writes them.
+Everything is made up from the seed so the same arguments always give the
+same solution.
+
+    python benchmark/generate.py <directory> [--projects N] [--files N] [--depth N]
+        [--configurations N] [--platforms N] [--nesting N] [--references N] [--seed N]
+"""
+import argparse
+import os
+import os.path
+import random
+import uuid
+
+_cppType = "{8BC9CEB8-8B4A-11D0-8D11-00A0C91BC942}"
+_folderType = "{2150E333-8FDC-42A3-9474-1A3956D46DE8}"
+_configurationNames = ["Debug", "Release", "Profile", "Final", "Test", "Shipping"]
+_platformNames = ["Win32", "x64", "ARM", "ARM64"]
+_words = ["core", "render", "engine", "network", "audio", "physics", "utils", "platform",
+          "shaders", "math", "tools", "interface", "memory", "io", "script", "ui"]
+
+# Solution folders under each folder (and at the top) when they're nested
+_foldersPerFolder = 3
+
+# Filters under each filter of a project (and at the top)
+_filtersPerFilter = 4
+
+def _Guid(rng):
+    return "{%s}" % str(uuid.UUID(int=rng.getrandbits(128))).upper()
+
+def _Escape(text):
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\"", "&quot;")
+
+def Generate(directory, projects=100, files=300, depth=3, configurations=2, platforms=2, nesting=2, references=2, seed=0):
+    """Writes the solution to directory/generated.sln (and the projects in a
+    directory each) and returns its path. Each project has files files in
+    filters nested depth levels, the projects are spread over solution
+    folders nested nesting levels (none if 0) and reference up to
+    references of the projects before them. Every few projects also depend
+    on another one through the sln instead"""
+    rng = random.Random(seed)
+    configurations = _configurationNames[:max(1, configurations)]
+    platforms = _platformNames[:max(1, platforms)]
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    # Solution folders, the projects go in the deepest ones
+    folders = []        # (name, guid, parent guid)
+    leaves = [None]
+    for level in range(0, nesting):
+        parents = leaves
+        leaves = []
+        for parent in parents:
+            for i in range(0, _foldersPerFolder):
+                folder = ("%s%d" % (rng.choice(_words).capitalize(), len(folders)), _Guid(rng), parent)
+                folders.append(folder)
+                leaves.append(folder[1])
+
+    names = []
+    guids = []
+    for p in range(0, projects):
+        names.append("%s%d" % (rng.choice(_words), p))
+        guids.append(_Guid(rng))
+        referenced = rng.sample(range(0, p), min(p, rng.randint(0, references))) if references > 0 else []
+        _WriteProject(os.path.join(directory, names[p]), names[p], files, depth, configurations, platforms,
+                      [(names[r], guids[r]) for r in referenced], rng)
+
+    lines = ["", "Microsoft Visual Studio Solution File, Format Version 11.00", "# Visual Studio 2010"]
+    for name, guid, parent in folders:
+        lines.append("Project(\"%s\") = \"%s\", \"%s\", \"%s\"" % (_folderType, name, name, guid))
+        lines.append("EndProject")
+    for p in range(0, projects):
+        path = os.path.join(names[p], names[p] + ".vcxproj")   # So it can be opened here, VS is fine with either slash
+        lines.append("Project(\"%s\") = \"%s\", \"%s\", \"%s\"" % (_cppType, names[p], path, guids[p]))
+        if p > 0 and p % 5 == 0:
+            dependency = guids[rng.randrange(0, p)]
+            lines.append("\tProjectSection(ProjectDependencies) = postProject")
+            lines.append("\t\t%s = %s" % (dependency, dependency))
+            lines.append("\tEndProjectSection")
+        lines.append("EndProject")
+
+    lines.append("Global")
+    lines.append("\tGlobalSection(SolutionConfigurationPlatforms) = preSolution")
+    for c in configurations:
+        for p in platforms:
+            lines.append("\t\t%s|%s = %s|%s" % (c, p, c, p))
+    lines.append("\tEndGlobalSection")
+    lines.append("\tGlobalSection(ProjectConfigurationPlatforms) = postSolution")
+    for guid in guids:
+        for c in configurations:
+            for p in platforms:
+                lines.append("\t\t%s.%s|%s.ActiveCfg = %s|%s" % (guid, c, p, c, p))
+                lines.append("\t\t%s.%s|%s.Build.0 = %s|%s" % (guid, c, p, c, p))
+    lines.append("\tEndGlobalSection")
+    lines.append("\tGlobalSection(SolutionProperties) = preSolution")
+    lines.append("\t\tHideSolutionNode = FALSE")
+    lines.append("\tEndGlobalSection")
+    if folders:
+        lines.append("\tGlobalSection(NestedProjects) = preSolution")
+        for name, guid, parent in folders:
+            if parent != None:
+                lines.append("\t\t%s = %s" % (guid, parent))
+        for p in range(0, projects):
+            lines.append("\t\t%s = %s" % (guids[p], leaves[p % len(leaves)]))
+        lines.append("\tEndGlobalSection")
+    lines.append("EndGlobal")
+
+    path = os.path.join(directory, "generated.sln")
+    with open(path, "wb") as f:
+        f.write("\r\n".join(lines) + "\r\n")
+    return path
+
+def _WriteProject(directory, name, files, depth, configurations, platforms, references, rng):
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    # Each file goes in a filter made of depth words, its path follows it
+    names = [rng.sample(_words, _filtersPerFilter) for level in range(0, depth)]
+    items = []
+    filters = set()
+    for i in range(0, files):
+        parts = [rng.choice(names[level]) for level in range(0, depth)]
+        for level in range(1, depth + 1):
+            filters.add("\\".join(parts[:level]))
+        if i % 3 == 2:
+            items.append(("ClInclude", "%s\\%s%d.h" % ("\\".join(parts), name, i), "\\".join(parts)))
+        else:
+            items.append(("ClCompile", "%s\\%s%d.cpp" % ("\\".join(parts), name, i), "\\".join(parts)))
+
+    xml = ["<?xml version=\"1.0\" encoding=\"utf-8\"?>",
+           "<Project DefaultTargets=\"Build\" ToolsVersion=\"4.0\" xmlns=\"http://schemas.microsoft.com/developer/msbuild/2003\">",
+           "  <ItemGroup Label=\"ProjectConfigurations\">"]
+    for c in configurations:
+        for p in platforms:
+            xml.append("    <ProjectConfiguration Include=\"%s|%s\">" % (c, p))
+            xml.append("      <Configuration>%s</Configuration>" % c)
+            xml.append("      <Platform>%s</Platform>" % p)
+            xml.append("    </ProjectConfiguration>")
+    xml.append("  </ItemGroup>")
+    xml.append("  <PropertyGroup Label=\"Globals\">")
+    xml.append("    <RootNamespace>%s</RootNamespace>" % name)
+    xml.append("  </PropertyGroup>")
+    xml.append("  <ItemGroup>")
+    for tag, path, filter in items:
+        xml.append("    <%s Include=\"%s\" />" % (tag, _Escape(path)))
+    xml.append("  </ItemGroup>")
+    if references:
+        xml.append("  <ItemGroup>")
+        for referenced, guid in references:
+            xml.append("    <ProjectReference Include=\"..\\%s\\%s.vcxproj\">" % (referenced, referenced))
+            xml.append("      <Project>%s</Project>" % guid.lower())
+            xml.append("    </ProjectReference>")
+        xml.append("  </ItemGroup>")
+    xml.append("</Project>")
+    with open(os.path.join(directory, name + ".vcxproj"), "wb") as f:
+        f.write("\r\n".join(xml) + "\r\n")
+
+    xml = ["<?xml version=\"1.0\" encoding=\"utf-8\"?>",
+           "<Project ToolsVersion=\"4.0\" xmlns=\"http://schemas.microsoft.com/developer/msbuild/2003\">",
+           "  <ItemGroup>"]
+    for filter in sorted(filters):
+        xml.append("    <Filter Include=\"%s\">" % _Escape(filter))
+        xml.append("      <UniqueIdentifier>%s</UniqueIdentifier>" % _Guid(rng))
+        xml.append("    </Filter>")
+    xml.append("  </ItemGroup>")
+    xml.append("  <ItemGroup>")
+    for tag, path, filter in items:
+        xml.append("    <%s Include=\"%s\">" % (tag, _Escape(path)))
+        xml.append("      <Filter>%s</Filter>" % _Escape(filter))
+        xml.append("    </%s>" % tag)
+    xml.append("  </ItemGroup>")
+    xml.append("</Project>")
+    with open(os.path.join(directory, name + ".vcxproj.filters"), "wb") as f:
+        f.write("\r\n".join(xml) + "\r\n")
+
+def AddArguments(parser, projects=100, files=300):
+    """The generator's arguments, shared with the suite (see suite.py)"""
+    parser.add_argument("--projects", type=int, default=projects, help="number of projects (default %d)" % projects)
+    parser.add_argument("--files", type=int, default=files, help="files per project (default %d)" % files)
+    parser.add_argument("--depth", type=int, default=3, help="levels of filters in each project (default 3)")
+    parser.add_argument("--configurations", type=int, default=2, help="solution configurations (default 2)")
+    parser.add_argument("--platforms", type=int, default=2, help="solution platforms (default 2)")
+    parser.add_argument("--nesting", type=int, default=2, help="levels of solution folders (default 2)")
+    parser.add_argument("--references", type=int, default=2, help="most projects a project references (default 2)")
+    parser.add_argument("--seed", type=int, default=0)
+
+def GetOptions(args):
+    """The generator's arguments out of the parsed ones, as keyword arguments for Generate"""
+    names = ("projects", "files", "depth", "configurations", "platforms", "nesting", "references", "seed")
+    return dict((name, getattr(args, name)) for name in names)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Writes a synthetic solution")
+    parser.add_argument("directory")
+    AddArguments(parser)
+    args = parser.parse_args()
+    print Generate(args.directory, **GetOptions(args))
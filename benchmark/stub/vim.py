@@ -0,0 +1,76 @@
+"""Stand-in for the vim module so the plugin can be benchmarked in a plain
+Python process. Buffers are plain lists that count how many times they're
+called into, which is what costs the most inside of Vim."""
+
+vars = {}
+crossings = 0
+
+def _Cross():
+    global crossings
+    crossings += 1
+
+class Buffer(list):
+    def __init__(self, name=""):
+        list.__init__(self, [""])
+        self.name = name
+        self.valid = True
+        self.options = {}
+
+    def __len__(self):
+        _Cross()
+        return list.__len__(self)
+
+    def __setitem__(self, key, value):
+        _Cross()
+        if isinstance(key, slice):
+            list.__setitem__(self, key, [] if value == None else value)
+            # Vim buffers always have at least one line
+            if list.__len__(self) == 0:
+                list.append(self, "")
+        else:
+            list.__setitem__(self, key, value)
+
+    def __setslice__(self, i, j, value):
+        self.__setitem__(slice(i, j), value)
+
+    def append(self, lines, nr=None):
+        _Cross()
+        if not isinstance(lines, list):
+            lines = [lines]
+        if nr == None:
+            self.extend(lines)
+        else:
+            list.__setitem__(self, slice(nr, nr), lines)
+
+class Window:
+    def __init__(self, buffer):
+        self.buffer = buffer
+        self.valid = True
+        self.cursor = (1, 0)
+        self.height = 50
+
+class _Current:
+    pass
+
+current = _Current()
+current.buffer = Buffer()
+current.window = Window(current.buffer)
+buffers = [current.buffer]
+windows = [current.window]
+
+def command(cmd):
+    _Cross()
+
+def eval(expr):
+    _Cross()
+    if expr.startswith("exists("):
+        return "1" if expr[len("exists('g:"):-2] in vars else "0"
+    if expr.startswith("g:"):
+        return str(vars[expr[2:]])
+    if expr == "line(\".\")":
+        return str(current.window.cursor[0])
+    if expr == "col(\".\")":
+        return str(current.window.cursor[1] + 1)
+    return "0"
+
+List = list
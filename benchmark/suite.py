@@ -0,0 +1,240 @@
+"""Runs the benchmarks that matter for big solutions on a synthetic one (see
+generate.py) and prints how long each took, the best of a few runs:
+
+    sln_parse           Solution reading only the .sln (the projects lazily)
+    project_load        Solution reading every project file
+    project_load_cached Solution with everything in the parse cache
+    tree_render         SolutionView.Render of the whole tree expanded
+    ctrlp_list          Solvent.GetCtrlPFileList the first time
+    build_events        BuildEventDecoder and BuildEventStore on logger output
+
+With --json the results are also written to a file which --compare can
+read back, so two versions can be compared on the same solution:
+
+    python benchmark/suite.py --json before.json
+    python benchmark/suite.py --compare before.json
+"""
+import argparse
+import gc
+import json
+import os.path
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+pluginDir = os.path.join(here, "..", "plugin")
+sys.path.insert(0, pluginDir)
+sys.path.insert(0, os.path.join(here, "stub"))
+
+import vim
+import generate
+from vimutil import VimUtil
+from solventcore.host import Host
+from solventcore.solution import Solution
+from solventcore.tree import Folder
+from solventcore.buildevent import BuildEventDecoder, BuildEventStore
+from solutionview import SolutionView
+
+# Bump this whenever what's measured changes, results of different versions can't be compared
+Version = 1
+
+def _Settings(**settings):
+    """Settings for the core and for the plugin, whichever is reading them"""
+    for name, value in settings.items():
+        Host.settings[name] = value
+        vim.vars["solvent_" + name] = int(value) if isinstance(value, bool) else value   # Like vim has them
+
+def _ExpandAll(folder):
+    folder.expanded = True
+    for c in folder.children:
+        if isinstance(c, Folder):
+            _ExpandAll(c)
+
+def SolutionParse(path, options):
+    _Settings(lazy_load=True, parse_cache=False)
+    start = time.time()
+    solution = Solution(path)
+    elapsed = time.time() - start
+    solution.Close()
+    return elapsed, {"projects": len(solution.projectDefs)}
+
+def ProjectLoad(path, options):
+    _Settings(lazy_load=False, parse_cache=False)
+    start = time.time()
+    solution = Solution(path)
+    elapsed = time.time() - start
+    solution.Close()
+    return elapsed, {"files": sum(len(p.files) for p in solution.projects)}
+
+def ProjectLoadCached(path, options):
+    _Settings(lazy_load=False, parse_cache=True)
+    Solution(path).Close()      # Fills the cache if it's not there yet
+    start = time.time()
+    solution = Solution(path)
+    elapsed = time.time() - start
+    solution.Close()
+    return elapsed, {"files": sum(len(p.files) for p in solution.projects)}
+
+def TreeRender(path, options):
+    _Settings(lazy_load=False, parse_cache=True, virtual_render=0)
+    solution = Solution(path)
+    _ExpandAll(solution)
+    view = SolutionView(solution)
+    view.buffer = vim.current.buffer
+    view.window = vim.current.window
+    vim.crossings = 0
+    start = time.time()
+    view.Render()
+    elapsed = time.time() - start
+    solution.Close()
+    return elapsed, {"lines": len(view.buffer), "crossings": vim.crossings}
+
+def CtrlPList(path, options):
+    _Settings(lazy_load=False, parse_cache=True)
+
+    # solvent.py is what vim runs with :Dissolve, it opens the solution of the current buffer
+    vim.vars["python_filename"] = os.path.join(pluginDir, "solvent.py")
+    vim.current.buffer.name = path
+    namespace = {"__name__": "solvent"}
+    execfile(vim.vars["python_filename"], namespace)
+    Solvent = namespace["Solvent"]
+    Solvent.solution.Close()
+    start = time.time()
+    candidates = Solvent.GetCtrlPFileList()
+    elapsed = time.time() - start
+    return elapsed, {"candidates": len(candidates)}
+
+def BuildEvents(path, options):
+    # What SolventLogger.dll writes: pretty printed objects with a few of msbuild's own lines
+    lines = []
+    events = options["events"]
+    for i in range(0, events):
+        if i % 100 == 0:
+            lines.append("Building the projects in this solution one at a time.\n")
+        if i % 50 == 0:
+            values = {"type": "BuildWarning", "timestamp": "12:00:00", "code": "C4100", "projectfile": path,
+                      "linenumber": i % 1000, "endlinenumber": 0, "columnnumber": 1, "endcolumnnumber": 0,
+                      "message": "src\\file%d.cpp(%d,1): unreferenced parameter %d" % (i, i % 1000, i)}
+        else:
+            values = {"type": "BuildMessage", "timestamp": "12:00:00", "importance": "High", "message": "message %d" % i}
+        lines.extend((json.dumps(values, indent=2) + "\n").splitlines(True))
+
+    start = time.time()
+    decoder = BuildEventDecoder()
+    store = BuildEventStore()
+    for line in lines:
+        for e in decoder.Feed(line):
+            store.Add(e)
+    for e in decoder.Flush():
+        store.Add(e)
+    elapsed = time.time() - start
+    return elapsed, {"events": len(store)}
+
+Benchmarks = [
+    ("sln_parse", SolutionParse),
+    ("project_load", ProjectLoad),
+    ("project_load_cached", ProjectLoadCached),
+    ("tree_render", TreeRender),
+    ("ctrlp_list", CtrlPList),
+    ("build_events", BuildEvents),
+    ]
+
+def Run(path, options, runs, only=None):
+    """Returns name -> {"seconds": best time, "runs": all the times, ...counts}"""
+    results = {}
+    for name, benchmark in Benchmarks:
+        if only and name not in only:
+            continue
+        times = []
+        for i in range(0, runs):
+            gc.collect()
+            elapsed, counts = benchmark(path, options)
+            times.append(round(elapsed, 4))
+        result = {"seconds": min(times), "runs": times}
+        result.update(counts)
+        results[name] = result
+        print "%-20s %8.3fs  %s" % (name, result["seconds"], ", ".join("%s %d" % c for c in sorted(counts.items())))
+    return results
+
+def Compare(results, previous, threshold):
+    """Prints how each benchmark changed, returns whether any got slower than threshold"""
+    if previous.get("version") != Version:
+        print "The results to compare with were measured differently (version %s)" % previous.get("version")
+        return False
+    if previous.get("solution") != results["solution"]:
+        print "Warning: the results to compare with were measured on another solution"
+    slower = False
+    for name, benchmark in Benchmarks:
+        if name not in results["results"] or name not in previous["results"]:
+            continue
+        now = results["results"][name]["seconds"]
+        before = previous["results"][name]["seconds"]
+        change = (now - before) / before if before > 0 else 0.0
+        marker = ""
+        if change > threshold:
+            marker = "  SLOWER"
+            slower = True
+        print "%-20s %8.3fs -> %8.3fs  %+6.1f%%%s" % (name, before, now, change * 100, marker)
+    return slower
+
+def _GetCommit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=here, stderr=subprocess.STDOUT).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks solvent on a synthetic solution")
+    generate.AddArguments(parser)
+    parser.add_argument("--events", type=int, default=50000, help="build events for build_events (default 50000)")
+    parser.add_argument("--runs", type=int, default=3, help="times each benchmark runs, the best one counts (default 3)")
+    parser.add_argument("--only", action="append", help="run only this benchmark (can be repeated)")
+    parser.add_argument("--solution", help="an existing solution to use instead of generating one")
+    parser.add_argument("--keep", help="generate the solution in this directory and keep it")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="compare with the results in this file, exit with 1 if anything got slower")
+    parser.add_argument("--threshold", type=float, default=0.1, help="how much slower is slower for --compare (default 0.1)")
+    args = parser.parse_args()
+
+    vim.vars["solvent_wakeup"] = "timer"    # Nothing calls UpdateAsync here
+    VimUtil.Init()
+    _Settings(watch=False)
+
+    options = generate.GetOptions(args)
+    directory = None
+    if args.solution:
+        path = os.path.abspath(args.solution)
+    else:
+        directory = args.keep or tempfile.mkdtemp(prefix="solvent-bench-")
+        print "Generating %(projects)d projects of %(files)d files..." % options
+        path = generate.Generate(directory, **options)
+    options["events"] = args.events
+
+    try:
+        results = {
+            "version": Version,
+            "commit": _GetCommit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "solution": path if args.solution else options,
+            "results": Run(path, options, args.runs, args.only),
+            }
+    finally:
+        if directory != None and not args.keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        print
+        if Compare(results, previous, args.threshold):
+            sys.exit(1)
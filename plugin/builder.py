@@ -1,3 +1,4 @@
+import vim
 import subprocess
 import sys
 import threading
@@ -7,17 +8,30 @@ import re, string;
 import Queue
 from vimutil import VimUtil
 from outputview import OutputView
-from buildevent import *
+from solventcore.buildlog import BuildLog, BuildLogReplay
+from solventcore.buildbackend import BuildBackend
+from solventcore.buildjob import BuildJob, BuildScheduler, JobStates
+from solventcore.buildevent import *
 
 class Builder:
     """Manages building a solution by invoking msbuild and monitoring its output"""
     def __init__(self, solution):
         self.solution = solution
 
-        self.process = None
-        self.monitor = None
+        self.scheduler = BuildScheduler()
+        self.monitors = []      # One per msbuild process of the running job
+        self.log = None
+        self.replay = None
+        self.cancelled = False  # Whether the running job was stopped
+
+        # Projects still to build when building in waves (see BuildWaves)
+        self.target = None
+        self.waves = []
+        self.ready = []         # ProjectDefs of the current wave not started yet
+        self.failed = False
+        self.quickfix = False
         self.outputview = OutputView(self)
-        self.buildevents = []
+        self.buildevents = BuildEventStore()
 
         # Where the monitor thread will put the processed output of msbuild
         self.outputqueue = Queue.Queue()
@@ -30,130 +44,298 @@ class Builder:
         self.Execute("clean")
     
     def Execute(self, target):
-        """Executes msbuild with the provided target"""
-        s = self.solution;
-        loggerPath = "D:\\Git\\vim_msbuild\\plugin\\SolventLogger.dll"
-        args = [
-            "C:\\Windows\\Microsoft.NET\\Framework\\v4.0.30319\\MSBuild.exe", # TODO: fix this path!
-            s.absolutePath,
-            "/t:" + target, 
-            "/property:Platform=" + s.platform.GetSelected(), 
-            "/property:Configuration=" + s.configuration.GetSelected(),
-            "/nologo",
-            "/noconsolelogger",
-            "/logger:" + loggerPath,
-            ]
-
-        # print args
-        self.outputview.Show()
-
-        startupinfo = subprocess.STARTUPINFO()
-        if subprocess.mswindows:
-            startupinfo.dwFlags = 0x00000010 | 0x00000001 # subprocess.CREATE_NEW_CONSOLE | subprocess.STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = 0x00000000 # subprocess.SW_HIDE
+        """Executes msbuild with the provided target on the whole solution, as
+        soon as the build that's running (if any) is done"""
+        self.__Submit(BuildJob(target))
+
+    def BuildAffected(self, path, quiet=False):
+        """Builds the project that has the file at the given path and every
+        project that depends on it, see BuildWaves. With a RemoteSolution
+        the build is queued once the model server answers"""
+        self.solution.RequestAffected(path, lambda waves: self.__BuildAffected(path, waves, quiet))
+
+    def __BuildAffected(self, path, waves, quiet):
+        if waves == None:
+            if not quiet:
+                print "\"" + path + "\" is not part of any project of the solution"
+            return
+        self.BuildWaves(waves, "build", not quiet)
+
+    def BuildWaves(self, waves, target, interactive=True):
+        """Builds the projects of each wave (a list of ProjectDefs) with msbuild
+        once the previous waves are built, see DependencyGraph.Waves. Projects
+        of the same wave are built at the same time (up to
+        g:solvent_build_jobs of them), the build stops if any project fails.
+        Builds that aren't interactive (e.g. on save) leave the cursor where
+        it is when they start"""
+        self.__Submit(BuildJob(target, [list(wave) for wave in waves]), interactive)
+
+    def __Submit(self, job, interactive=True):
+        """Queues the job (see BuildScheduler) and starts it if nothing else is running"""
+        self.scheduler.Submit(job)
+        if self.scheduler.running != None:
+            self.outputview.Update()    # So it shows something's queued
+        self.__StartNextJob(interactive)
+
+    def __StartNextJob(self, interactive=False):
+        """Starts the next queued job, any job that's done as soon as it's
+        started (e.g. msbuild couldn't be run) makes way for the next one.
+        Only a job the user just asked for is interactive, queued ones start
+        while the user is doing something else"""
+        job = self.scheduler.Next()
+        while job != None:
+            s = self.solution
+            self.__Start(interactive)
+            self.log = BuildLog.Create(s.absolutePath, job.target, VimUtil.GetSetting("build_logs", 10))
+            self.target = job.target
+            self.failed = False
+            self.cancelled = False
+            if job.waves == None:
+                self.__Spawn(s.absolutePath, job.target, s.configuration.GetSelected(), s.platform.GetSelected())
+            else:
+                self.waves = list(job.waves)
+                self.__StartProjects()
+            if not self.__CheckFinished():
+                return
+            job = self.scheduler.Next()
+
+    def __StartProjects(self):
+        """Starts as many projects of the current wave as allowed, moving on
+        to the next wave once the current one is built"""
+        s = self.solution
+        jobs = max(1, VimUtil.GetSetting("build_jobs", 4))
+        while not self.failed and len(self.monitors) < jobs:
+            if not self.ready:
+                if self.monitors or not self.waves:
+                    return      # The wave being built must be done first
+                self.ready = list(self.waves.pop(0))
+                continue
 
+            definition = self.ready.pop(0)
+            config = definition.GetOrCreateConfig(s.configuration.GetSelected(), s.platform.GetSelected())
+            if definition.type == "general" or not config.builds:
+                continue    # Nothing to build for the selected configuration
+
+            # The projects it references are built by the earlier waves
+            self.__Spawn(definition.absolutePath, self.target, config.configuration, config.platform,
+                         definition.name, {"BuildProjectReferences": "false"})
+
+    def __Spawn(self, path, target, configuration, platform, name=None, properties={}):
+        """Runs the backend and monitors its output from other threads"""
+        backend = BuildBackend.Create(VimUtil.GetSetting("build_backend", "msbuild"))
         try:
-            self.process = subprocess.Popen(args=args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, startupinfo=startupinfo)
+            process = backend.Start(path, target, configuration, platform, properties)
         except Exception as e:
-            self.process = None
+            self.failed = True
+            self.scheduler.running.exitcode = self.scheduler.running.exitcode or -1
             VimUtil.Print("Couldn't spawn msbuild process")
             VimUtil.Print(e)
+            return
+        self.monitors.append(_BuildMonitor(process, self.outputqueue, self.log, name))
+
+    def __CheckFinished(self):
+        """Finishes the running job once nothing of it is running or left to
+        build. Returns whether it finished"""
+        if self.scheduler.running == None:
+            return False
+        if self.monitors or ((self.waves or self.ready) and not self.failed):
+            return False
+        self.waves = []
+        self.ready = []
+        if self.log != None:
+            self.log.Close()
+            self.log = None
+        self.scheduler.Finish(self.cancelled)
+        return True
+
+    def Replay(self, path, realtime=False):
+        """Shows the events of a log written during a previous build (see
+        BuildLog) as if that build was running now"""
+        if self.IsRunning():
+            print "Can't replay a build log while building"
+            return
+        self.__Start(True)
+        self.replay = BuildLogReplay(path, self.outputqueue, realtime)
+
+    def __Start(self, interactive):
+        """Forgets about the events of the last build (or replay) and shows the
+        output. Unless interactive, the cursor stays in the window it was in"""
+        if self.replay != None:
+            self.replay.Stop()
+            self.replay = None
+        try:
+            while True:
+                self.outputqueue.get_nowait()
+        except Queue.Empty:
+            pass
+        self.buildevents.Clear()
 
-        # Did we succeeded creating the msbuild subprocess?
-        # Let a BuildMonitor run watch the output of msbuild from another thread
-        if self.process != None:
-            self.monitor = _BuildMonitor(self.process, self.outputqueue)
+        # Show would close the output window and open a new one, which
+        # becomes the current window
+        view = self.outputview
+        if view.IsOpen():
+            view.buffer, view.window = view.FindBufferAndWindow()
+            view.Render()
+        else:
+            window = vim.current.window
+            view.Show()
+            if not interactive and window.valid:
+                vim.current.window = window
+
+        # Errors and warnings go to a new quickfix list as they come in
+        self.quickfix = VimUtil.GetSetting("quickfix", True)
+        if self.quickfix:
+            vim.command("call setqflist([])")
 
     def Stop(self):
-        """Stops the current build, if any"""
-        if self.process != None:
-            self.process.terminate()
+        """Stops the current build, if any, and forgets about the queued ones.
+        The job is over once its processes are gone (see UpdateAsync)"""
+        self.scheduler.CancelQueued()
+        if self.scheduler.running != None:
+            self.cancelled = True
+            self.waves = []
+            self.ready = []
+            for m in self.monitors:
+                BuildBackend.Kill(m.process)
+        self.outputview.Update()
 
     def IsRunning(self):
-        return self.process != None
+        return self.scheduler.running != None
+
+    def GetStatus(self):
+        """A short summary of the build for the statusline (see SolventStatusLine)"""
+        errors = self.buildevents.Count(EventTypes.BuildError)
+        warnings = self.buildevents.Count(EventTypes.BuildWarning)
+        status = "E:%d W:%d" % (errors, warnings)
+        last = self.scheduler.GetLast()
+        if self.IsRunning():
+            status += " (building"
+            if self.scheduler.queued:
+                status += ", %d queued" % len(self.scheduler.queued)
+            status += ")"
+        elif last != None and last.state == JobStates.Cancelled:
+            status += " (stopped)"
+        elif last != None and last.exitcode:
+            status += " (failed)"
+        return status
+
+    def GetJobSummary(self):
+        """What's being shown in the output (see OutputView)"""
+        if self.replay != None:
+            return "Replay of " + self.replay.path
+        last = self.scheduler.GetLast()
+        if last == None:
+            return ""
+        summary = last.GetSummary()
+        if self.scheduler.queued:
+            summary += " (%d queued)" % len(self.scheduler.queued)
+        return summary
 
     def UpdateAsync(self):
-        while True:
-            needUpdate = False
-            try:
-                while True:
-                    e = self.outputqueue.get_nowait()
-                    self.buildevents.append(e)
-                    needUpdate = True
-            except Queue.Empty:
-                # Re-render if there are any new events events coming from the buildmonitor.
-                if needUpdate:
-                    self.outputview.Render()
-                break
-            except:
-                break
+        needUpdate = False
+        quickfix = []
+        try:
+            while True:
+                e = self.outputqueue.get_nowait()
+                self.buildevents.Add(e)
+                needUpdate = True
+                if self.quickfix and (e.type == EventTypes.BuildError or e.type == EventTypes.BuildWarning):
+                    quickfix.append(e.GetQuickfixItem())
+                # Each monitor queues this one once its msbuild is gone
+                # (replayed logs have them too but there's no job then)
+                job = self.scheduler.running
+                if e.type == EventTypes.BuildCompleted and job != None:
+                    self.monitors = [m for m in self.monitors if not m.completed]
+                    exitcode = e.values.get("exitcode")
+                    if exitcode != 0:
+                        self.failed = True
+                    if not job.exitcode:
+                        job.exitcode = exitcode
+                    self.__StartProjects()
+                    if self.__CheckFinished():
+                        break   # The next job starts once this one is shown
+        except Queue.Empty:
+            pass
+
+        # Append the lines of any new events coming from the buildmonitor
+        if needUpdate:
+            self.outputview.Update()
+
+        # Add all the new errors and warnings to the quickfix list at once
+        if quickfix:
+            vim.vars["solvent_quickfix_items"] = quickfix
+            vim.command("call setqflist(g:solvent_quickfix_items, 'a') | unlet g:solvent_quickfix_items")
+
+        self.__StartNextJob()
 
 class _BuildMonitor:
-    """Runs a thread that watches a queue where other two threads put the output
-    of stdout and stderr FIXME: I think we could live without this thread, using
-    the queue used by the _FileMonitor thread directly
-    """
+    """Watches the output of the msbuild process. The two _FileMonitor threads
+    that read stdout and stderr put the events straight into the builder's
+    queue and wake up vim, once both pipes are closed the process is waited
+    for and a final BuildCompleted event with its exit code is queued"""
 
-    def __init__(self, process, queue):
+    def __init__(self, process, queue, log=None, name=None):
         self.process = process
-        self.thread = threading.Thread(target=self.StartMonitoring, args=(process,))
-        self.thread.daemon = True    # So this thread dies with vim
-        self.thread.start()
         self.outputqueue = queue
+        self.log = log
+        self.name = name        # Of the project being built, None for the whole solution
+        self.completed = False
+        self.starttime = time.time()
+        self._lock = threading.Lock()
+        self._openfiles = 2
+        self._outmonitor = _FileMonitor(process.stdout, self.__OnEvents, self.__OnFileClosed)
+        self._errmonitor = _FileMonitor(process.stderr, self.__OnEvents, self.__OnFileClosed)
 
-    def StartMonitoring(self, process):
-        """This function monitors the msbuild process, printing from here will
-        sometime produce garbage output back in Vim so inter thread
-        synchronization must be used.
-        """
-
-        # Create the two threads that watch the output of msbuild stdout/stderr
-        queue = Queue.Queue()
-        outIter = _FileMonitor(process.stdout, queue)
-        errIter = _FileMonitor(process.stderr, queue)
-
-        returncode = None
-        while returncode == None:
-            needUpdate = False
-            try:
-                while True:
-                    event = queue.get_nowait()
-                    self.outputqueue.put(event)
-                    needUpdate = True
-            except Queue.Empty:
-                if needUpdate:
-                    VimUtil.TriggerUpdate()
-                # If the queue was empty and the process ended there is
-                # definitely nothing else to monitor so end this thread.
-                returncode = process.returncode 
-            time.sleep(0.300)
-
-        # Wait for process to terminate
-        VimUtil.Print("msbuild returned:" + str(returncode))
+    def __OnEvents(self, events):
+        """Called by the _FileMonitor threads with the events they read"""
+        if self.log != None:
+            self.log.Write(events)
+        for e in events:
+            self.outputqueue.put(e)
+        VimUtil.TriggerUpdate()
+
+    def __OnFileClosed(self):
+        """Called by each _FileMonitor thread when it reaches the end of its file"""
+        with self._lock:
+            self._openfiles -= 1
+            if self._openfiles > 0:
+                return
+
+        # Both pipes are closed so the process is done (or about to be)
+        returncode = self.process.wait()
+        elapsed = time.time() - self.starttime
+        message = "msbuild exited with code %d after %.1fs" % (returncode, elapsed)
+        if self.name != None:
+            message = self.name + ": " + message
+        self.completed = True   # Before the builder gets the event
+        self.__OnEvents([BuildEvent.FromValues({
+            "type": "BuildCompleted",
+            "timestamp": time.strftime("%H:%M:%S"),
+            "message": message,
+            "exitcode": returncode,
+            "elapsed": elapsed,
+            })])
 
 class _FileMonitor:
     """Monitors the provided file (i.e. stdout or stderr of the msbuild process)
-    and for each json object put in it it will create the corresponding instance
-    in the provided queue
+    and for each json object put in it it will create the corresponding
+    BuildEvent and pass it to onevents (see BuildEventDecoder)
     """
-    def __init__(self, file, queue):
-        self.thread = threading.Thread(target=self.StartMonitoring, args=(file, queue))
+    def __init__(self, file, onevents, onclosed):
+        self.thread = threading.Thread(target=self.StartMonitoring, args=(file, onevents, onclosed))
         self.thread.daemon = True    # So this thread dies with vim
         self.thread.start()
 
-    def StartMonitoring(self, file, queue):
-        buffer = ""
+    def StartMonitoring(self, file, onevents, onclosed):
+        decoder = BuildEventDecoder()
         for line in iter(file.readline, ''):
-            buffer += line
-            # Whenever we find a closing bracket by itself it's because we've
-            # found the end of an event. TODO: shouldn't this detection be more robust?
-            if ( # TODO: this is the handling of messages output by msbuild that don't come from our solventlogger.dll
-                 # we need to make this more robust because there might also be messages mixed in the jsons.
-               line.strip() == "}" or
-               line.startswith("Verbosity:") or
-               line.startswith("Building the projects in this solution one at a time")
-               ):
-                e = BuildEvent.FromJSON(buffer)
-                queue.put(e)
-                buffer = ""
+            events = decoder.Feed(line)
+            if events:
+                onevents(events)
+
+        # Whatever was left without an end
+        events = decoder.Flush()
+        if events:
+            onevents(events)
 
+        onclosed()
@@ -0,0 +1,117 @@
+import vim
+from vimutil import VimUtil
+from vimview import View
+from solventcore.tree import Actions
+from solventcore.fileindex import FileIndex
+
+class FindView(View):
+    """Window at the bottom where files of the solution are searched for by
+    name (see :SolventFind). The first line is the query, the best matches
+    are listed below it and updated as the query is typed"""
+
+    def __init__(self, solution):
+        View.__init__(self)
+        self.solution = solution
+        self.index = FileIndex()
+        self.query = ""
+        self.results = []
+        self.selected = 0
+
+        # View settings
+        self.bufferName = "solvent-find"     # Just some name nobody else would ever use
+        self.filetype = "solvent-find"       # This might be useful for autocmd?
+        self.splitoptions = "botright"
+        self.defaultViewSize = 15
+
+    def Show(self):
+        self._PrepareSearch()
+        self.query = ""
+        self.results = []
+        self.selected = 0
+
+        View.Show(self)
+        if self.buffer == None:
+            return
+
+        # Typing the query updates the results, the selection is moved with
+        # the usual completion keys
+        vim.command("augroup SolventFind")
+        vim.command("autocmd! * <buffer>")
+        vim.command("autocmd TextChanged,TextChangedI <buffer> python Solvent.findview.OnQueryChanged()")
+        vim.command("augroup END")
+        for key in ("<C-n>", "<C-j>", "<Down>"):
+            vim.command("inoremap <silent> <buffer> %s <C-o>:python Solvent.findview.Select(1)<CR>" % key)
+        for key in ("<C-p>", "<C-k>", "<Up>"):
+            vim.command("inoremap <silent> <buffer> %s <C-o>:python Solvent.findview.Select(-1)<CR>" % key)
+        vim.command("inoremap <silent> <buffer> <CR> <Esc>:python Solvent.findview.Accept()<CR>")
+        vim.command("inoremap <silent> <buffer> <C-c> <Esc>:python Solvent.findview.Close()<CR>")
+        vim.command("nnoremap <silent> <buffer> <CR> :python Solvent.findview.Accept()<CR>")
+        vim.command("nnoremap <silent> <buffer> <Esc> :python Solvent.findview.Close()<CR>")
+        vim.command("nnoremap <silent> <buffer> q :python Solvent.findview.Close()<CR>")
+        vim.command("startinsert!")
+
+    def Render(self):
+        """Renders the query and its results into the buffer"""
+        if self.buffer != None and self.buffer.valid:
+            self.buffer.options["modifiable"] = True    # The query is typed right in the buffer
+            self.buffer[:] = [self.query] + self.__RenderResults()
+
+    def OnQueryChanged(self):
+        query = self.buffer[0]
+        if query == self.query:
+            return      # Only the results changed (or were moved around)
+        self.query = query
+        self._Find(query, max(1, self.window.height - 1))
+
+    def _PrepareSearch(self):
+        # Every file is a candidate so lazily loaded projects must be read now
+        self.solution.LoadProjects(self.solution.projects, wait=True)
+        self.index.Update(self.solution)
+
+    def _Find(self, query, limit):
+        """Finds the files that match the query and shows them (see ShowResults)"""
+        # Projects might have been loaded again since the last query
+        self.index.Update(self.solution)
+        self.ShowResults(self.index.Find(query, limit))
+
+    def ShowResults(self, results):
+        self.results = results
+        self.selected = 0
+        self.buffer[1:] = self.__RenderResults()
+
+    def Select(self, delta):
+        """Moves the selection up (negative delta) or down"""
+        if not self.results:
+            return
+        self.selected = max(0, min(len(self.results) - 1, self.selected + delta))
+        self.buffer[1:] = self.__RenderResults()
+
+    def Accept(self):
+        """Opens the selected file, or the one under the cursor if the cursor
+        is on one of the results"""
+        row = VimUtil.GetCursor()[0]
+        if row > 1 and row - 2 < len(self.results):
+            self.selected = row - 2
+        file = self.results[self.selected] if self.results else None
+        self.Close()
+        if file != None:
+            file.PerformAction(Actions.OpenFile)
+
+    def Close(self):
+        if self.window != None and self.window.valid:
+            saved = vim.current.window
+            vim.current.window = self.window
+            vim.command("hide")
+            if saved.valid:
+                vim.current.window = saved
+
+    def __RenderResults(self):
+        lines = []
+        for i in range(0, len(self.results)):
+            f = self.results[i]
+            marker = "> " if i == self.selected else "  "
+            lines.append(marker + f.relativePath + "  (" + self._GetProjectName(f) + ")")
+        return lines
+
+    def _GetProjectName(self, file):
+        return file.project.definition.name
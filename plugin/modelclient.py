@@ -0,0 +1,258 @@
+import os.path
+import subprocess
+import threading
+import collections
+import Queue
+from vimutil import VimUtil
+from solventcore.protocol import Connection
+from solventcore.project import ProjectDef
+from solventcore.tree import TreeOption, Actions
+
+_pluginDir = os.path.dirname(os.path.abspath(__file__))
+
+# The g:solvent_ settings the core reads while it has the solution, they're
+# sent to the server along with it
+_modelSettings = [("parse_cache", True), ("load_workers", 1), ("lazy_load", False), ("watch", True), ("watch_interval", 2.0)]
+
+class ModelClient:
+    """Runs a model server (python -m solventcore serve, see
+    solventcore/server.py) and talks to it. Answers and events are read by a
+    thread of its own and handled by UpdateAsync on vim's main thread, so
+    nothing waits for the server unless Call is used. The last lines the
+    server wrote to stderr are shown if it's gone (e.g. the python in the
+    PATH can't run it)"""
+
+    # Lines of the server's stderr kept to show
+    ErrorLines = 20
+
+    def __init__(self):
+        startupinfo = None
+        if subprocess.mswindows:
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags = 0x00000010 | 0x00000001 # CREATE_NEW_CONSOLE | STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = 0x00000000 # SW_HIDE
+
+        # Vim's own python can't be run so it's whatever python is in the PATH
+        python = VimUtil.GetSetting("server_python", "python")
+        self.process = subprocess.Popen([python, "-m", "solventcore", "serve"], cwd=_pluginDir,
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE, startupinfo=startupinfo)
+        self.connection = Connection(self.process.stdout, self.process.stdin)
+        self.nextid = 1
+        self.callbacks = {}     # id -> what to call with the answer, for requests not answered yet
+        self.handlers = {}      # event -> what to call with its args
+        self.messages = Queue.Queue()
+        self.closed = False
+
+        thread = threading.Thread(target=self.__Read)
+        thread.daemon = True    # So this thread dies with vim
+        thread.start()
+
+        # stderr has to be read too or the server would block once the pipe is full
+        self.errors = collections.deque(maxlen=ModelClient.ErrorLines)
+        self._errorThread = threading.Thread(target=self.__ReadErrors)
+        self._errorThread.daemon = True
+        self._errorThread.start()
+        VimUtil.RegisterAsyncComponent(self)
+
+    def __Read(self):
+        while True:
+            message = self.connection.Receive()
+            self.messages.put(message)
+            VimUtil.TriggerUpdate()
+            if message == None:
+                self.process.wait()     # So it doesn't linger as a zombie
+                return
+
+    def __ReadErrors(self):
+        for line in iter(self.process.stderr.readline, ""):
+            self.errors.append(line.rstrip("\r\n"))
+
+    def On(self, event, handler):
+        """Calls handler with the args of the event whenever the server sends it"""
+        self.handlers[event] = handler
+
+    def Request(self, method, args, callback=None):
+        """Sends a request, callback is called with the answer by UpdateAsync
+        (requests that fail only get the error printed)"""
+        if self.closed:
+            return
+        id = self.nextid
+        self.nextid += 1
+        self.callbacks[id] = callback
+        if not self.connection.Send([id, method, args]):
+            del self.callbacks[id]
+            self.__Gone()
+        return id
+
+    def Call(self, method, *args):
+        """Sends a request and waits for the answer, which is returned (None
+        if the request failed). Whatever else comes in meanwhile is handled
+        like UpdateAsync does"""
+        answer = []
+        id = self.Request(method, list(args), answer.append)
+        while id in self.callbacks:
+            message = self.messages.get()
+            self.__Handle(message)
+            if message == None:
+                break
+        return answer[0] if answer else None
+
+    def UpdateAsync(self):
+        try:
+            while True:
+                self.__Handle(self.messages.get_nowait())
+        except Queue.Empty:
+            pass
+
+    def __Handle(self, message):
+        if message == None:
+            self.__Gone()
+            return
+        if message[0] == 0:
+            handler = self.handlers.get(message[1])
+            if handler != None:
+                handler(*message[2])
+            return
+        callback = self.callbacks.pop(message[0], None)
+        if len(message) > 2:
+            print "Model server error: " + message[2]
+        elif callback != None:
+            callback(message[1])
+
+    def __Gone(self):
+        if not self.closed:
+            # Whatever it said last is most likely why
+            self._errorThread.join(1.0)
+            for line in list(self.errors):
+                print line
+            print "The model server is gone, run :Dissolve to start it again"
+        self.closed = True
+        self.callbacks = {}
+
+    def Close(self):
+        """Has the server quit. Only its stdin is closed here, the server quits
+        on EOF even if the close request didn't make it, and then the reader
+        thread gets EOF on stdout and is done too"""
+        if not self.closed:
+            self.closed = True
+            self.connection.Send([self.nextid, "close", []])
+            try:
+                self.process.stdin.close()
+            except (IOError, OSError):
+                pass
+
+class RemoteSolution:
+    """Stands in for a Solution kept by a model server (see g:solvent_model_server)
+    so vim only has the lines of the tree view, not the tree. Has what the
+    views and the builder use, anything that needs the model is a request.
+    The solution is opened in the background, opened is called with the
+    RemoteSolution once it is"""
+
+    def __init__(self, path, opened=None):
+        self.name = os.path.basename(path)
+        self.absolutePath = os.path.abspath(path)
+        self.solutionDir = os.path.dirname(path)
+        self.buildable = False      # Until it's opened
+        self.builder = None
+        self.configuration = TreeOption("Config  ", [], 0)
+        self.platform = TreeOption("Platform", [], 0)
+        self.opened = opened
+
+        # The lines of the tree view as the server has them (see TreeLines),
+        # each change to them bumps version. changed is called with each change
+        # as start, end and the lines that replace those.
+        self.lines = ["", " (opening %s...)" % self.name]
+        self.version = None
+        self.changed = None
+
+        # The files for ctrlp, kept until a project is loaded again (see GetFiles)
+        self.generation = None
+        self._files = []
+
+        self.client = ModelClient()
+        self.client.On("lines", self.__OnLines)
+        self.client.On("open", VimUtil.OpenFile)
+        self.client.On("print", self.__OnPrint)
+        settings = dict((name, VimUtil.GetSetting(name, default)) for name, default in _modelSettings)
+        self.client.Request("open", [self.absolutePath, settings], self.__OnOpened)
+
+    def Close(self):
+        self.client.Close()
+
+    def __OnPrint(self, text):
+        print text
+
+    def __OnOpened(self, state):
+        self.buildable = state["buildable"]
+        self.configuration.options = state["configurations"]
+        self.platform.options = state["platforms"]
+        self.__SetState(state)
+        self.__Change(0, len(self.lines), state["lines"])
+        if self.opened != None:
+            self.opened(self)
+
+    def __SetState(self, state):
+        self.version = state["version"]
+        self.configuration.selectedIndex = state["configuration"]
+        self.platform.selectedIndex = state["platform"]
+
+    def __OnLines(self, version, start, end, lines):
+        """Projects were loaded in the background"""
+        self.version = version
+        self.__Change(start, end, lines)
+
+    def __Change(self, start, end, lines):
+        self.lines[start:end] = lines
+        if self.changed != None:
+            self.changed(start, end, lines)
+
+    def PerformActions(self, index, actions):
+        """Has the server perform the actions on the node of the given line,
+        the lines are changed once it answers"""
+        if self.version != None:
+            self.client.Request("action", [self.version, index, actions], self.__OnActions)
+
+    def __OnActions(self, state):
+        if state == None:
+            return      # The lines changed before the server got to it, nothing was done
+        self.__SetState(state)
+        for start, end, lines in state["changes"]:
+            self.__Change(start, end, lines)
+
+    def Find(self, query, limit, callback):
+        """Calls callback with the RemoteFiles that best match the query (see FileIndex)"""
+        self.client.Request("find", [query, limit], lambda files: callback([RemoteFile(*f) for f in files]))
+
+    def GetFiles(self):
+        """Every file of the solution as name, id and RemoteFiles of each
+        project. Waits for the server, ctrlp needs them right away"""
+        answer = self.client.Call("files", self.generation)
+        if answer != None:
+            self.generation = answer["generation"]
+            self._files = [(name, id, [RemoteFile(*f) for f in files]) for name, id, files in answer["projects"]]
+        return self._files
+
+    def RequestAffected(self, path, callback):
+        """Calls callback with the ProjectDefs BuildAffected would build for
+        the file at path in waves (see DependencyGraph.Waves), or with None
+        if no project has the file"""
+        def OnAffected(waves):
+            if waves == None:
+                callback(None)
+            else:
+                callback([[ProjectDef.Unpack(self, d) for d in wave] for wave in waves])
+        self.client.Request("affected", [path], OnAffected)
+
+class RemoteFile:
+    """A file of a RemoteSolution, see Find and GetFiles"""
+    __slots__ = ("relativePath", "projectName", "absolutePath")
+
+    def __init__(self, relativePath, projectName, absolutePath):
+        self.relativePath = relativePath
+        self.projectName = projectName
+        self.absolutePath = absolutePath
+
+    def PerformAction(self, action):
+        if action == Actions.OpenFile:
+            VimUtil.OpenFile(self.absolutePath)
@@ -1,7 +1,7 @@
 import vim
 from vimutil import VimUtil
 from vimview import View
-from buildevent import *
+from solventcore.buildevent import *
 
 # TODO: Call this BuilderView?
 class OutputView(View):
@@ -14,6 +14,12 @@ class OutputView(View):
         self.showmessages = True
         self.minimportance = MessageImportance.High
 
+        # How many of the builder's events are already in the buffer and which
+        # filter settings were used to render them (see Update)
+        self._renderedcount = 0
+        self._renderedfilter = None
+        self._renderedheader = None
+
         # View settings
         self.bufferName = "solvent-output"     # Just some name nobody else would ever use
         self.filetype = "solvent-output"       # This might be useful for autocmd?
@@ -28,25 +34,12 @@ class OutputView(View):
             # Save the mouse cursor because it's reset to zero when we clear the buffer
             cursor = VimUtil.GetCursor()
 
-            # Clear everything before we render
-            self.buffer[:] = None
+            # Clear everything and render all the events at once
             self._lineToEventMapping.clear()
-
-            for e in self.builder.buildevents:
-                # Filter messages
-                if (e.type == EventTypes.BuildMessage and
-                   ((not self.showmessages) or e.importance < self.minimportance)):
-                    continue
-
-                # Filter errors
-                if e.type == EventTypes.BuildError and not self.showerrors:
-                    continue
-
-                # Filter warnings
-                if e.type == EventTypes.BuildWarning and not self.showwarnings:
-                    continue
-
-                self.buffer.append(e.GetRenderedString())
+            self._renderedheader = self.builder.GetJobSummary()
+            self.buffer[:] = [self._renderedheader] + self.__RenderEvents(0)
+            self._renderedcount = len(self.builder.buildevents)
+            self._renderedfilter = self.__GetFilter()
 
             self.window.cursor = (len(self.buffer), 0)
 
@@ -54,3 +47,45 @@ class OutputView(View):
             # VimUtil.SetCursor(cursor[0], cursor[1])
             self.buffer.options["modifiable"] = False
 
+    def Update(self):
+        """Appends the lines of the events that arrived since the last time the
+        view was rendered and updates the state of the job in the first line.
+        Everything is rendered again only if the filter settings changed in
+        the meantime"""
+        if self.buffer == None or not self.buffer.valid:
+            return
+
+        events = self.builder.buildevents
+        if self._renderedfilter != self.__GetFilter() or self._renderedcount > len(events):
+            self.Render()
+            return
+
+        lines = self.__RenderEvents(self._renderedcount)
+        self._renderedcount = len(events)
+        header = self.builder.GetJobSummary()
+        if lines or header != self._renderedheader:
+            self.buffer.options["modifiable"] = True
+            if header != self._renderedheader:
+                self.buffer[0] = header
+                self._renderedheader = header
+            if lines:
+                self.buffer.append(lines)
+                if self.window != None and self.window.valid:
+                    self.window.cursor = (len(self.buffer), 0)
+            self.buffer.options["modifiable"] = False
+
+    def __GetFilter(self):
+        return (self.showerrors, self.showwarnings, self.showmessages, self.minimportance)
+
+    def __RenderEvents(self, start):
+        """Returns the lines for the events from index start on that pass the filters"""
+        types = []
+        for t in EventTypes.All:
+            # Filter messages, errors and warnings
+            if t == EventTypes.BuildMessage and not self.showmessages: continue
+            if t == EventTypes.BuildError and not self.showerrors: continue
+            if t == EventTypes.BuildWarning and not self.showwarnings: continue
+            types.append(t)
+
+        events = self.builder.buildevents.Select(types, self.minimportance, start)
+        return [e.GetRenderedString() for e in events]
@@ -0,0 +1,61 @@
+import vim
+from vimutil import VimUtil
+from vimview import View
+from findview import FindView
+
+class RemoteSolutionView(View):
+    """The tree of a RemoteSolution (see g:solvent_model_server). It only
+    has the lines, actions are sent to the server and the lines change once
+    it answers"""
+
+    def __init__(self, solution):
+        View.__init__(self)
+        self.solution = solution
+        solution.changed = self.__OnLinesChanged
+
+        # View settings, the same as SolutionView's
+        self.bufferName = "solvent-tree"
+        self.filetype = "solvent-tree"
+        self.defaultViewSize = 32
+
+    def Render(self):
+        if self.buffer != None and self.buffer.valid:
+            self.buffer.options["modifiable"] = True
+            cursor = VimUtil.GetCursor()
+            self.buffer[:] = self.solution.lines
+            VimUtil.SetCursor(cursor[0], cursor[1])
+            self.buffer.options["modifiable"] = False
+
+    def __OnLinesChanged(self, start, end, lines):
+        if self.buffer == None or not self.buffer.valid:
+            return
+        if start == 0:
+            self.Render()   # Everything changed, keep the cursor where it is
+        else:
+            self.buffer.options["modifiable"] = True
+            self.buffer[start:end] = lines
+            self.buffer.options["modifiable"] = False
+
+    def OnCursorMoved(self):
+        pass    # Every line has its text
+
+    def PerformActions(self, actions):
+        """Has the server perform the actions on the selected node"""
+        assert vim.current.buffer == self.buffer
+        self.solution.PerformActions(VimUtil.GetCursor()[0] - 1, actions)
+
+class RemoteFindView(FindView):
+    """FindView of a RemoteSolution, the server does the searching"""
+
+    def _PrepareSearch(self):
+        pass    # Projects are loaded by the server when it's asked
+
+    def _Find(self, query, limit):
+        def OnFound(files):
+            # The query might have changed while the server was at it
+            if query == self.query and self.buffer != None and self.buffer.valid:
+                self.ShowResults(files)
+        self.solution.Find(query, limit, OnFound)
+
+    def _GetProjectName(self, file):
+        return file.projectName
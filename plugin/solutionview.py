@@ -1,6 +1,6 @@
 import vim
 from vimutil import VimUtil
-from tree import Actions
+from solventcore.treelines import TreeLines
 from vimview import View
 
 class SolutionView(View):
@@ -10,102 +10,137 @@ class SolutionView(View):
         View.__init__(self)
 
         self.solution = solution
-        self._lineToNodeMapping = {}
+
+        # Flattened model of the visible lines (see TreeLines), item i belongs
+        # to line i + 1 of the buffer
+        self.lines = TreeLines(solution)
+
+        # With g:solvent_virtual_render only the lines around the viewport are
+        # actually rendered, the rest are left empty until they're scrolled to.
+        # _lineRendered tells which lines of the buffer have their text.
+        self.virtual = VimUtil.GetSetting("virtual_render", False)
+        self._lineRendered = bytearray()
 
         # View settings
         self.bufferName = "solvent-tree"     # Just some name nobody else would ever use
         self.filetype = "solvent-tree"       # This might be useful for autocmd?
         self.defaultViewSize = 32
 
+        # Projects might be loaded in the background (see Solution.LoadProjects)
+        VimUtil.RegisterAsyncComponent(self)
+
     def Render(self):
         """Renders the tree into the current buffer"""
         if self.buffer != None and self.buffer.valid:
-            self.buffer.options["modifiable"] = True
-
-            # Save the mouse cursor because it's reset to zero when we clear the buffer
-            cursor = VimUtil.GetCursor()
+            # Recursively flatten the tree and write all the lines at once
+            self.__RenderAll(self.lines.Flatten(not self.virtual))
 
-            # Clear everything before we render
-            self.buffer[:] = None
-            self._lineToNodeMapping.clear()
-
-            # Recursively render the tree
-            self.__RenderTree(self.solution, 0)
-
-            # print self.buffer.name
-            # print self.window.name
-            # print self.window.buffer.name
-
-            # Move the cursor back to where we originally were
-            VimUtil.SetCursor(cursor[0], cursor[1])
-            self.buffer.options["modifiable"] = False
+    def __RenderAll(self, lines):
+        """Writes the whole flattened model into the buffer, lines is None
+        with virtual rendering"""
+        self.buffer.options["modifiable"] = True
 
-    def __RenderTree(self, node, depth):
-        """Helper method that does the actual rendering recursively"""
+        # Save the mouse cursor because it's reset to zero when we clear the buffer
+        cursor = VimUtil.GetCursor()
 
-        # Render the expand symbold (TODO: move this to be part of the node?)
-        if len(node.children) > 0:
-            if node.expanded:
-                statusSym = "-"
-            else:
-                statusSym = "+"
+        if self.virtual:
+            self.buffer[:] = [""] * len(self.lines)
+            self._lineRendered = bytearray(len(self.lines))
+            self._lineRendered[0] = 1
         else:
-            statusSym = " "
-
-        # setup the mapping for this node so we know in which line it is
-        self._lineToNodeMapping[len(self.buffer) + 1] = node
+            self.buffer[:] = lines
+
+        # Move the cursor back to where we originally were
+        VimUtil.SetCursor(cursor[0], cursor[1])
+        if self.virtual:
+            self.__RenderViewport()
+        self.buffer.options["modifiable"] = False
+
+    def RenderNode(self, node, oldLineCount):
+        """Renders again only the lines of the given node and its visible
+        descendants. oldLineCount is the number of lines the node took the
+        last time it was rendered, those lines are replaced by the new ones
+        and the following lines are just shifted"""
+        if self.buffer == None or not self.buffer.valid:
+            return
+        change = self.lines.FlattenNode(node, oldLineCount, not self.virtual)
+        if change != None:
+            self.__RenderChange(change)
+
+    def __RenderChange(self, change):
+        """Replaces the lines of the buffer that changed in the flattened
+        model, see TreeLines.FlattenNode"""
+        index, end, lines = change
+        self.buffer.options["modifiable"] = True
+        if self.virtual:
+            self.buffer[index:end] = [""] * lines
+            self._lineRendered[index:end] = bytearray(lines)
+            self.__RenderViewport()
+        else:
+            self.buffer[index:end] = lines
+        self.buffer.options["modifiable"] = False
 
-        # Render the node
-        indent = " " * depth
-        self.buffer.append(indent + statusSym + node.GetNodeName())
+    def OnCursorMoved(self):
+        """Renders the lines that became visible (only with g:solvent_virtual_render)"""
+        if self.virtual and self.buffer != None and self.buffer.valid:
+            self.buffer.options["modifiable"] = True
+            self.__RenderViewport()
+            self.buffer.options["modifiable"] = False
 
-        # Recursively render this node's children
-        if node.expanded:
-            for child in node.children:
-                if node.IndentsChildren():
-                    self.__RenderTree(child, depth + 1)
-                else:
-                    self.__RenderTree(child, depth + 0)
+    def __RenderViewport(self):
+        """Renders the lines around the window's viewport that haven't been
+        rendered yet. Consecutive lines are written with a single assignment"""
+        # The window might not be the current one so we can't ask vim for the
+        # top line, but the viewport can't be farther than a window height
+        # away from the cursor. Render a few screens above and below too.
+        margin = 2 * self.window.height if self.window != None and self.window.valid else 100
+        row = self.window.cursor[0] - 1 if self.window != None and self.window.valid else 0
+        first = max(0, row - margin)
+        last = min(len(self.lines), row + margin + 1)
+
+        i = first
+        while i < last:
+            if self._lineRendered[i]:
+                i += 1
+                continue
+            j = i
+            while j < last and not self._lineRendered[j]:
+                j += 1
+            self.buffer[i:j] = [self.lines.RenderLine(k) for k in range(i, j)]
+            self._lineRendered[i:j] = "\x01" * (j - i)
+            i = j
+
+    def UpdateAsync(self):
+        # Render the projects that were (re)loaded in the background. Their
+        # old children are gone from the tree so the lines they took are
+        # counted in the flattened model.
+        projects = self.solution.UpdateAsync()
+        if projects and self.buffer != None and self.buffer.valid:
+            for change in self.lines.FlattenReloaded(projects, not self.virtual):
+                self.__RenderChange(change)
 
     def GetSelected(self):
         cursor = VimUtil.GetCursor()
-        if cursor[0] in self._lineToNodeMapping:
-            return self._lineToNodeMapping[cursor[0]]
+        if cursor[0] - 1 < len(self.lines):
+            return self.lines.nodes[cursor[0] - 1]
         else:
             return None
 
+    def PerformActions(self, actions):
+        for action in actions:
+            self.PerformAction(action)
+
     def PerformAction(self, action):
         """Forwards the action to the currently selected node"""
         assert vim.current.window == self.window
         assert vim.current.buffer == self.buffer
 
-        # Forward the action to the currently selected node
-        selected = self.GetSelected()
-        if selected != None:
-            selected.PerformAction(action)
-
-            # Actions that apply to all descendants of the selected node
-            if action == Actions.ExpandDescendants: 
-                self.__PerformInDescendants(selected, Actions.Expand)
-            if action == Actions.CollapseDescendants: 
-                self.__PerformInDescendants(selected, Actions.Collapse)
-
-        # Actions that apply to all nodes
-        if action == Actions.ExpandAll: 
-            for n in self._lineToNodeMapping.values(): 
-                n.PerformAction(Actions.Expand) 
-        if action == Actions.CollapseAll: 
-            for n in self._lineToNodeMapping.values(): 
-                n.PerformAction(Actions.Collapse) 
-        if action == Actions.ExpandOrCollapseAll: 
-            for n in self._lineToNodeMapping.values(): 
-                n.PerformAction(Actions.ExpandOrCollapse) 
-
-        # Render again because something probably changed
-        if vim.current.window == self.window:
-            self.Render()
-
-    def __PerformInDescendants(self, node, action):
-        node.PerformAction(action)
-        for c in node.children:
-            self.__PerformInDescendants(c, action)
+        change = self.lines.PerformAction(VimUtil.GetCursor()[0] - 1, action, not self.virtual)
+
+        # Render again what changed
+        if change != None and vim.current.window == self.window:
+            index, end, lines = change
+            if index == 0:
+                self.__RenderAll(lines)
+            else:
+                self.__RenderChange((index, end, lines))
@@ -8,33 +8,59 @@ import sys
 __file__ = vim.vars["python_filename"]
 sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
 
-from solution import Solution
+from solventcore.solution import Solution
 from solutionview import SolutionView
-from tree import Actions
+from builder import Builder
+from solventcore.tree import Actions
 from vimutil import VimUtil, MapScopes
 from outputview import OutputView
+from findview import FindView
+from modelclient import RemoteSolution
+from remoteview import RemoteSolutionView, RemoteFindView
 
 class Solvent:
     """Manages the plugin, keeps the state of the plugin in static variables. (i.e. the current solution
     is stored in Solvent.solution)"""
     treeview = None
     outputview = None
+    findview = None
+
+    # The ctrlp candidates of the current solution (see GetCtrlPFileList)
+    _ctrlpKey = None
+    _ctrlpList = None
+    _ctrlpFiles = {}    # line -> File (RemoteFile with a model server)
 
     @staticmethod
     def UseSolution(solutionPath):
         """Initializes the plugin, this method should only be called once or bad things might happen?"""
         Solvent._actionMappings = {}
         
-        # Create the solution and the tree treeview.
-        Solvent.solution = Solution(solutionPath)
-        Solvent.treeview = SolutionView(Solvent.solution)
+        # Create the solution and the tree treeview. With g:solvent_model_server
+        # the solution is kept by another process (see RemoteSolution), it
+        # can be built once it's open. The one opened by the previous
+        # :Dissolve is closed first so its watcher (or server) is gone.
+        if VimUtil.solution != None:
+            VimUtil.solution.Close()
+            VimUtil.solution = None
+        if VimUtil.GetSetting("model_server", False):
+            Solvent.solution = RemoteSolution(solutionPath, Solvent.AttachBuilder)
+            Solvent.treeview = RemoteSolutionView(Solvent.solution)
+            Solvent.findview = RemoteFindView(Solvent.solution)
+        else:
+            Solvent.solution = Solution(solutionPath)
+            Solvent.AttachBuilder(Solvent.solution)
+            Solvent.treeview = SolutionView(Solvent.solution)
+            Solvent.findview = FindView(Solvent.solution)
+        VimUtil.solution = Solvent.solution
 
         # Hook to some autocommand we're interested in
         vim.command("augroup Solvent")
         vim.command("autocmd!")
         vim.command("autocmd BufEnter %s* stopinsert" % (Solvent.treeview.bufferName))
         vim.command("autocmd BufEnter %s* python Solvent.SetKeyBindings()" % (Solvent.treeview.bufferName))
+        vim.command("autocmd CursorMoved %s* python Solvent.treeview.OnCursorMoved()" % (Solvent.treeview.bufferName))
         vim.command("autocmd WinLeave * python VimUtil.OnWinLeave()")
+        vim.command("autocmd BufWritePost * python Solvent.OnFileSaved()")
         vim.command("augroup END")
 
         Solvent.treeview.Show()
@@ -56,6 +82,11 @@ class Solvent:
 
         Solvent.SetKeyBindings()
 
+    @staticmethod
+    def AttachBuilder(solution):
+        if solution.buildable:
+            solution.builder = Builder(solution)
+
     @staticmethod
     def SetKeyBindings():
         # Disable editing.
@@ -70,11 +101,45 @@ class Solvent:
         if Solvent.solution.builder != None:
             Solvent.solution.builder.Build()
 
+    @staticmethod
+    def BuildCurrent():
+        """Builds the project of the current file and the ones that depend on it"""
+        if Solvent.solution.builder != None:
+            Solvent.solution.builder.BuildAffected(vim.current.buffer.name)
+
+    @staticmethod
+    def Stop():
+        if Solvent.solution.builder != None:
+            Solvent.solution.builder.Stop()
+
+    @staticmethod
+    def OnFileSaved():
+        """With g:solvent_build_on_save the project of a file is built (see
+        BuildCurrent) whenever the file is saved"""
+        if Solvent.solution.builder != None and VimUtil.GetSetting("build_on_save", False):
+            Solvent.solution.builder.BuildAffected(vim.eval("expand('<afile>:p')"), quiet=True)
+
     @staticmethod
     def Clean():
         if Solvent.solution.builder != None:
             Solvent.solution.builder.Clean()
 
+    @staticmethod
+    def Find():
+        if Solvent.findview != None:
+            Solvent.findview.Show()
+
+    @staticmethod
+    def Replay(path, realtime=False):
+        if Solvent.solution.builder != None:
+            Solvent.solution.builder.Replay(path, realtime)
+
+    @staticmethod
+    def GetStatusLine():
+        if Solvent.solution.builder != None:
+            return Solvent.solution.builder.GetStatus()
+        return ""
+
     @staticmethod
     def MapKey(key, actions):
         Solvent._actionMappings[key] = actions
@@ -83,6 +148,7 @@ class Solvent:
     def PerformAction(actions):
         actions = actions.split(",")
 
+        actionNums = []
         for action in actions:
             actionNum = 0
             action = action.strip().lower()
@@ -99,20 +165,42 @@ class Solvent:
             if action == "openfileinhorisplit": actionNum = Actions.OpenFileInHoriSplit
             if action == "toggleoption": actionNum = Actions.ToggleOption
             if actionNum > 0:
-                Solvent.treeview.PerformAction(actionNum)
+                actionNums.append(actionNum)
+        Solvent.treeview.PerformActions(actionNums)
 
     @staticmethod
     def GetCtrlPFileList():
         """Return the complete list of files to vimscript to be used inside ctrlp"""
-        result = []
-        if Solvent.treeview != None and Solvent.solution != None:
-            for p in Solvent.solution.projects:
-                pid = p.GetProjectId()
-                projectName = p.definition.name
-                for i in range(0, len(p.files)):
-                    f = p.files[i]
-                    result.append(f.relativePath + " \t(in " + projectName + ") (id:" + str(pid) + "-" + str(i) + ")")
-        return vim.List(result)
+        if Solvent.treeview == None or Solvent.solution == None:
+            return vim.List([])
+
+        # Every file is a candidate so lazily loaded projects must be read now
+        solution = Solvent.solution
+        if isinstance(solution, RemoteSolution):
+            projects = solution.GetFiles()
+        else:
+            solution.LoadProjects(solution.projects, wait=True)
+            projects = [(p.definition.name, p.id, p.files) for p in solution.projects]
+
+        # The list is only built again if a project was (re)loaded since
+        key = (solution, solution.generation)
+        if Solvent._ctrlpKey != key:
+            encoding = vim.eval("&encoding")
+            lines = []
+            files = {}
+            for name, id, projectFiles in projects:
+                suffix = " \t(in " + name + ") (id:" + str(id) + "-"
+                for i in range(0, len(projectFiles)):
+                    f = projectFiles[i]
+                    line = f.relativePath + suffix + str(i) + ")"
+                    if isinstance(line, unicode):
+                        line = line.encode(encoding)    # So it matches what ctrlp passes back
+                    lines.append(line)
+                    files[line] = f
+            Solvent._ctrlpList = vim.List(lines)
+            Solvent._ctrlpFiles = files
+            Solvent._ctrlpKey = key
+        return Solvent._ctrlpList
 
     @staticmethod
     def AcceptCtrlPStr():
@@ -122,13 +210,10 @@ class Solvent:
         mode = vim.vars["solvent_strParam1"]
         line = vim.vars["solvent_strParam2"]
 
-        # Extract the id from the string which uniquely identifies each file
-        m = re.search("\(id:([0-9]*)-([0-9]*)\)$", line)
-        projectIndex = int(m.group(1))
-        fileIndex = int(m.group(2))
-
         # Open the file
-        Solvent.solution.projects[projectIndex].files[fileIndex].PerformAction(Actions.OpenFile)
+        file = Solvent._ctrlpFiles.get(line)
+        if file != None:
+            file.PerformAction(Actions.OpenFile)
 
 VimUtil.Init()
 Solvent.UseSolution(vim.current.buffer.name)
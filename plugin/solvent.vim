@@ -16,6 +16,32 @@ function! SolventDissolve()
     execute "pyfile ".escape(g:python_filename, '\\')
 endfunction
 
+" Called when a background thread needs the plugin to update (see VimUtil.TriggerUpdate)
+function! SolventWakeup(channel, msg)
+    python VimUtil.UpdateAsync()
+endfunction
+
+function! SolventPoll(timer)
+    python VimUtil.PollUpdate()
+endfunction
+
+" Build errors/warnings so far for use in 'statusline' (e.g. set statusline+=%{SolventStatusLine()})
+function! SolventStatusLine()
+    if !exists('g:python_filename')
+        return ''
+    endif
+    return pyeval("Solvent.GetStatusLine()")
+endfunction
+
+command! SolventFind py Solvent.Find()
 command! SolventBuild py Solvent.Build()
+command! SolventBuildCurrent py Solvent.BuildCurrent()
 command! SolventClean py Solvent.Clean()
+command! SolventStop py Solvent.Stop()
+command! -bang -nargs=1 -complete=file SolventReplay call SolventReplay(<q-args>, <bang>0)
+
+" Replays a build log, at the pace it was written if realtime is set
+function! SolventReplay(log, realtime)
+    python Solvent.Replay(vim.eval("expand(a:log)"), vim.eval("a:realtime") == "1")
+endfunction
 
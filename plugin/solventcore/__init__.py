@@ -0,0 +1,3 @@
+"""The solution model, project parsing and build machinery of the plugin.
+Nothing in here imports vim so it can be used (and profiled) from a plain
+python process, see __main__.py and host.py"""
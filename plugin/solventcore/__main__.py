@@ -0,0 +1,90 @@
+"""Command line entry point to use the core without vim, from the plugin
+directory (or with it in PYTHONPATH):
+
+    python -m solventcore stats foo.sln [--workers N] [--no-cache]
+    python -m solventcore serve
+
+stats prints how long the solution and its projects take to parse and
+what's in them. serve keeps a solution for the plugin and answers its
+requests through stdin and stdout (see server.py)"""
+import argparse
+import sys
+import time
+from host import Host
+from solution import Solution
+from tree import Folder
+from project import Project
+from server import SolutionServer
+
+def _CountFolders(folder):
+    """Filters in the projects under folder"""
+    count = 0
+    for c in folder.children:
+        if isinstance(c, Folder):
+            count += _CountFolders(c) + (0 if isinstance(c, Project) else 1)
+    return count
+
+def Stats(args):
+    # Nothing watches the files in a one off run
+    Host.settings["watch"] = False
+    Host.settings["load_workers"] = args.workers
+    Host.settings["parse_cache"] = not args.no_cache
+
+    # Only the sln is read at first so its time can be told apart
+    Host.settings["lazy_load"] = True
+    start = time.time()
+    solution = Solution(args.solution)
+    if not hasattr(solution, "projects"):
+        return 1
+    slnTime = time.time() - start
+
+    definitions = solution.projectDefs
+    cached = sum(1 for d in definitions if d.type != "general" and solution.cache.GetProject(d) != None)
+    start = time.time()
+    solution.LoadProjects(solution.projects, wait=True)
+    loadTime = time.time() - start
+
+    start = time.time()
+    graph = solution.GetDependencyGraph()
+    graphTime = time.time() - start
+
+    types = {}
+    for d in definitions:
+        types[d.type] = types.get(d.type, 0) + 1
+    failed = [p.definition.name for p in solution.projects if not p.loaded and p.definition.type != "general"]
+
+    print "solution      %s (format %s)" % (solution.absolutePath, solution.formatVersion)
+    print "configs       %s | %s" % (", ".join(solution.configurations), ", ".join(solution.platforms))
+    print "projects      %d (%s)" % (len(definitions), ", ".join("%d %s" % (n, t) for t, n in sorted(types.items())))
+    print "files         %d" % sum(len(p.files) for p in solution.projects)
+    print "filters       %d" % sum(_CountFolders(p) for p in solution.projects if p.definition.type != "general")
+    print "dependencies  %d" % sum(len(d) for d in graph.dependencies.itervalues())
+    print "parse sln     %.3fs" % slnTime
+    print "load projects %.3fs (%d workers, %d of %d projects cached)" % (
+        loadTime, args.workers, cached, len(definitions) - types.get("general", 0))
+    print "dependencies  %.3fs" % graphTime
+    if failed:
+        print "failed        %s" % ", ".join(failed)
+    solution.Close()
+    return 0
+
+def Serve(args):
+    SolutionServer(sys.stdin, sys.stdout).Run()
+    return 0
+
+def Main(argv):
+    parser = argparse.ArgumentParser(prog="python -m solventcore", description="Solvent without vim")
+    commands = parser.add_subparsers()
+    stats = commands.add_parser("stats", help="parse a solution and print timings and counts")
+    stats.add_argument("solution")
+    stats.add_argument("--workers", type=int, default=1, help="threads reading the project files (default 1)")
+    stats.add_argument("--no-cache", action="store_true", help="don't use or write the .solventcache file")
+    stats.set_defaults(command=Stats)
+    serve = commands.add_parser("serve", help="keep a solution for the plugin (see g:solvent_model_server)")
+    serve.set_defaults(command=Serve)
+
+    args = parser.parse_args(argv)
+    return args.command(args)
+
+if __name__ == "__main__":
+    sys.exit(Main(sys.argv[1:]))
@@ -0,0 +1,194 @@
+import os
+import os.path
+import sys
+import json
+import time
+import signal
+import threading
+import subprocess
+from host import Host
+
+# Where the plugin's files are (e.g. SolventLogger.dll)
+_pluginDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class BuildBackend:
+    """What the tools that can build a solution have in common, Create
+    returns the one to use (MSBuildBackend unless g:solvent_build_backend
+    says otherwise). Each one has
+
+        Start(path, target, configuration, platform, properties={})
+
+    which returns an object that behaves like a subprocess.Popen whose
+    stdout has the output of SolventLogger.dll (see _BuildMonitor). Path is
+    either the solution or a project, properties are any other msbuild
+    properties to set"""
+
+    @staticmethod
+    def Create(name):
+        """Returns the backend with the given name (see g:solvent_build_backend)"""
+        if name == "dotnet":
+            return DotnetBackend()
+        if name == "fake":
+            return FakeBackend(Host.GetSetting("fake_build_events", 10000),
+                               Host.GetSetting("fake_build_rate", 1000),
+                               Host.GetSetting("fake_build_errors", 0.01))
+        return MSBuildBackend(Host.GetSetting("msbuild_path", MSBuildBackend.DefaultPath()))
+
+    @staticmethod
+    def LoggerPath():
+        return Host.GetSetting("logger_path", os.path.join(_pluginDir, "SolventLogger.dll"))
+
+    @staticmethod
+    def Spawn(args):
+        """Runs the build tool without a console window popping up on windows.
+        Elsewhere it gets a process group of its own so it can be killed
+        along with whatever it runs (see Kill)"""
+        startupinfo = None
+        preexec = None
+        if subprocess.mswindows:
+            startupinfo = BuildBackend.__HiddenWindow()
+        else:
+            preexec = os.setsid
+        return subprocess.Popen(args=args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                startupinfo=startupinfo, preexec_fn=preexec)
+
+    @staticmethod
+    def Kill(process):
+        """Stops a process returned by Start and every process it started (the
+        compiler, linker, msbuild nodes...), those would otherwise keep
+        running and keep the output pipes open"""
+        if not isinstance(process, subprocess.Popen):
+            process.terminate()     # Not a real process (see FakeBackend)
+            return
+        try:
+            if subprocess.mswindows:
+                subprocess.call(["taskkill", "/F", "/T", "/PID", str(process.pid)], startupinfo=BuildBackend.__HiddenWindow())
+            else:
+                os.killpg(process.pid, signal.SIGTERM)
+        except OSError:
+            pass    # Already gone
+
+    @staticmethod
+    def __HiddenWindow():
+        startupinfo = subprocess.STARTUPINFO()
+        startupinfo.dwFlags = 0x00000010 | 0x00000001 # subprocess.CREATE_NEW_CONSOLE | subprocess.STARTF_USESHOWWINDOW
+        startupinfo.wShowWindow = 0x00000000 # subprocess.SW_HIDE
+        return startupinfo
+
+    @staticmethod
+    def MSBuildArguments(path, target, configuration, platform, properties):
+        args = [
+            path,
+            "/t:" + target,
+            "/property:Platform=" + platform,
+            "/property:Configuration=" + configuration,
+            "/nologo",
+            "/noconsolelogger",
+            "/nodeReuse:false",         # Worker nodes that outlive msbuild would keep the pipes open
+            "/logger:" + BuildBackend.LoggerPath(),
+            ]
+        for name, value in sorted(properties.items()):
+            args.append("/property:%s=%s" % (name, value))
+        return args
+
+class MSBuildBackend(BuildBackend):
+    """Builds with MSBuild.exe (or mono's msbuild)"""
+    def __init__(self, path):
+        self.path = path
+
+    @staticmethod
+    def DefaultPath():
+        if sys.platform == "win32":
+            return "C:\\Windows\\Microsoft.NET\\Framework\\v4.0.30319\\MSBuild.exe"
+        return "msbuild"
+
+    def Start(self, path, target, configuration, platform, properties={}):
+        return BuildBackend.Spawn([self.path] + BuildBackend.MSBuildArguments(path, target, configuration, platform, properties))
+
+class DotnetBackend(BuildBackend):
+    """Builds with the msbuild that comes with the .NET SDK (dotnet msbuild)"""
+    def Start(self, path, target, configuration, platform, properties={}):
+        return BuildBackend.Spawn(["dotnet", "msbuild"] + BuildBackend.MSBuildArguments(path, target, configuration, platform, properties))
+
+class FakeBackend(BuildBackend):
+    """Pretends to build by writing the same kind of output SolventLogger.dll
+    does (pretty printed json objects with some plain lines in between) at
+    the given rate (events per second, 0 for as fast as possible). It runs
+    in a thread instead of a process so it works anywhere, the output still
+    goes through real pipes so everything else sees a build as usual"""
+    def __init__(self, events, rate, errors):
+        self.events = events
+        self.rate = rate
+        self.errors = errors    # Fraction of the events that are errors (as many are warnings)
+
+    def Start(self, path, target, configuration, platform, properties={}):
+        return _FakeProcess(self, path, target)
+
+class _FakeProcess:
+    """The part of subprocess.Popen that the builder uses"""
+    def __init__(self, backend, path, target):
+        self.backend = backend
+        self.returncode = None
+        self._stop = threading.Event()
+
+        outread, outwrite = os.pipe()
+        errread, errwrite = os.pipe()
+        self.stdout = os.fdopen(outread, "rb")
+        self.stderr = os.fdopen(errread, "rb")
+        os.close(errwrite)      # Nothing goes to stderr
+
+        self._thread = threading.Thread(target=self.__Run, args=(os.fdopen(outwrite, "wb"), path, target))
+        self._thread.daemon = True    # So this thread dies with vim
+        self._thread.start()
+
+    def __Run(self, out, path, target):
+        backend = self.backend
+        errorEvery = max(1, int(round(0.5 / backend.errors))) if backend.errors > 0 else 0
+        start = time.time()
+        try:
+            out.write("Verbosity: Normal\n")
+            self.__Write(out, {"type": "BuildStarted", "message": "Build started."})
+            for i in range(0, backend.events):
+                if self._stop.is_set():
+                    break
+                if backend.rate > 0:
+                    wait = start + float(i) / backend.rate - time.time()
+                    if wait > 0 and self._stop.wait(wait):
+                        break
+
+                values = {"importance": "High", "message": "Fake message %d of %s %s" % (i, target, os.path.basename(path))}
+                if errorEvery and i % errorEvery == 0:
+                    # The keys the logger writes for errors and warnings, the
+                    # file is only in the message
+                    line = i % 100 + 1
+                    values = {"projectfile": path, "code": "C1234", "linenumber": line, "endlinenumber": 0,
+                              "columnnumber": 1, "endcolumnnumber": 0,
+                              "message": "src\\fake%d.cpp(%d,1): fake error %d" % (i, line, i)}
+                    values["type"] = "BuildError" if (i / errorEvery) % 2 else "BuildWarning"
+                else:
+                    values["type"] = "BuildMessage"
+                self.__Write(out, values)
+            self.__Write(out, {"type": "BuildFinished", "message": "Build finished.", "succeeded": not self._stop.is_set()})
+        except IOError:
+            pass    # Nobody is reading anymore
+        finally:
+            out.close()
+        self.returncode = 1 if self._stop.is_set() else 0
+
+    def __Write(self, out, values):
+        values["timestamp"] = time.strftime("%H:%M:%S")
+        out.write(json.dumps(values, indent=2) + "\n")
+        if self.backend.rate > 0:
+            out.flush()     # Otherwise events would show up in bursts
+
+    def wait(self):
+        self._thread.join()
+        return self.returncode
+
+    def poll(self):
+        return self.returncode
+
+    def terminate(self):
+        self._stop.set()
+
+    kill = terminate
@@ -0,0 +1,314 @@
+import os.path
+import re
+import json
+import bisect
+import heapq
+
+class MessageImportance:
+    Low     = 0
+    Medium  = 1
+    High    = 2
+
+class EventTypes:
+    """Event types generated by msbuild"""
+    Unknown               = 0
+    RawMessage            = 1
+    BuildStarted          = 2
+    BuildFinished         = 3
+    ProjectStarted        = 4
+    ProjectFinished       = 5
+    TargetStarted         = 6
+    TargetFinished        = 7
+    TaskStarted           = 8
+    TaskFinished          = 9
+    BuildMessage          = 10
+    BuildWarning          = 11
+    BuildError            = 12
+    BuildCompleted        = 13      # Not from msbuild, queued once the msbuild process exits
+
+    All = range(Unknown, BuildCompleted + 1)
+
+    @staticmethod
+    def GetString(t):
+        if t == EventTypes.Unknown: return "Unknown"
+        if t == EventTypes.RawMessage: return "Message"
+        if t == EventTypes.BuildStarted: return "Build Started"
+        if t == EventTypes.BuildFinished: return "Build Finished"
+        if t == EventTypes.ProjectStarted: return "Project Started"
+        if t == EventTypes.ProjectFinished: return "Project Finished"
+        if t == EventTypes.TargetStarted: return "Target Started"
+        if t == EventTypes.TargetFinished: return "Target Finished"
+        if t == EventTypes.TaskStarted: return "Task Started"
+        if t == EventTypes.TaskFinished: return "Task Finished"
+        if t == EventTypes.BuildMessage: return "Message"
+        if t == EventTypes.BuildWarning: return "Warning"
+        if t == EventTypes.BuildError: return "ERROR"
+        if t == EventTypes.BuildCompleted: return "Build Completed"
+
+# The file of an error or warning as tools print it before the message,
+# e.g. "src\main.cpp(12,5): error C2065: ..." (the column is optional)
+_originPattern = re.compile(r"^\s*(.+?)\((\d+)(?:,(\d+))?(?:,\d+,\d+)?\)\s*:\s*(.*)$", re.DOTALL)
+
+class BuildEvent:
+    def __init__(self):
+        self.type = EventTypes.Unknown
+        self.importance = MessageImportance.High
+        self.values = None
+        self.expanded = False
+        pass
+
+    def __getitem__(self, i):
+        if self.values:
+            return self.values[i]
+        else:
+            return None
+
+    def __setitem__(self, i, values):
+        if self.values == None:
+            self.values = {}
+        self.values[i] = values
+
+    def GetRenderedString(self):
+        result = EventTypes.GetString(self.type).ljust(16) + "| " + self["shortmessage"]
+        # TODO: handle expanded!
+        return result
+
+    def GetQuickfixItem(self):
+        """Returns the quickfix entry (see :help setqflist) for an error or a
+        warning. The logger doesn't write the file, only the project, so it's
+        taken from the "path(line,col):" the message starts with if it does.
+        Relative paths are relative to the project's directory"""
+        values = self.values
+        item = {"type": "E" if self.type == EventTypes.BuildError else "W"}
+        text = self["shortmessage"]
+        lnum = values.get("linenumber")
+        col = values.get("columnnumber")
+
+        match = _originPattern.match(text)
+        if match:
+            filename, text = match.group(1).strip(), match.group(4)
+            if not os.path.isabs(filename) and values.get("projectfile"):
+                filename = os.path.join(os.path.dirname(values.get("projectfile")), filename)
+            item["filename"] = filename
+            lnum = lnum or match.group(2)
+            col = col or match.group(3)
+
+        if values.get("code") and values.get("code") not in text:
+            text = values.get("code") + ": " + text
+        item["text"] = text
+        try:
+            item["lnum"] = int(lnum or 0)
+            item["col"] = int(col or 0)
+        except ValueError:
+            pass
+        return item
+
+    @staticmethod
+    def FromJSON(jsonstr):
+        """Reads the input string and returns a BuildEvent object containing
+        all the data from the json string accessible as a dictionary. Some
+        values (i.e. type and importance) are copied to their respective
+        BuildEvent fields for faster usage during filtering.  If jsonstr is not
+        an actual json object the BuildEvent returned is a RawMessage with the
+        "message" value containg whatever was passed in jsonstr
+        """ 
+        try:
+            values = json.loads(jsonstr)
+        except ValueError:
+            return BuildEvent.FromRawMessage(jsonstr)
+        if not BuildEvent.IsEvent(values):
+            return BuildEvent.FromRawMessage(jsonstr)
+        return BuildEvent.FromValues(values)
+
+    @staticmethod
+    def IsEvent(values):
+        """True if values decoded from json can be an event of the logger,
+        i.e. it's an object with a type. Anything else is just text that
+        looks like json"""
+        return isinstance(values, dict) and isinstance(values.get("type"), basestring)
+
+    @staticmethod
+    def FromRawMessage(message):
+        """Returns a RawMessage event for text that didn't come from the logger"""
+        values = {}
+        values["type"] = "RawMessage"
+        values["timestamp"] = "n/a"
+        values["message"] = message
+        return BuildEvent.FromValues(values)
+
+    @staticmethod
+    def FromValues(values):
+        """Returns a BuildEvent for the given dictionary of values (e.g. as
+        they're read from the json objects output by the logger, see
+        IsEvent). Events without a message get an empty one"""
+        result = BuildEvent()
+        result.values = values
+        if not isinstance(values.get("message"), basestring):
+            message = values.get("message")
+            values["message"] = "" if message == None else unicode(message)
+
+        # Get the short version of the message (the first line) which is rendered
+        # when the event is collapsed in the builder view.
+        try:
+            result["shortmessage"] = result["message"][0:result["message"].index("\n")]
+        except ValueError:
+            result["shortmessage"] = result["message"]
+
+        assert result["type"]
+
+        type = result["type"].strip().lower()
+        if type == "rawmessage": result.type = EventTypes.RawMessage
+        if type == "buildstarted": result.type = EventTypes.BuildStarted
+        if type == "buildfinished": result.type = EventTypes.BuildFinished
+        if type == "projectstarted": result.type = EventTypes.ProjectStarted
+        if type == "projectfinished": result.type = EventTypes.ProjectFinished
+        if type == "targetstarted": result.type = EventTypes.TargetStarted
+        if type == "targetfinished": result.type = EventTypes.TargetFinished
+        if type == "taskstarted": result.type = EventTypes.TaskStarted
+        if type == "taskfinished": result.type = EventTypes.TaskFinished
+        if type == "buildmessage": result.type = EventTypes.BuildMessage
+        if type == "buildwarning": result.type = EventTypes.BuildWarning
+        if type == "builderror": result.type = EventTypes.BuildError
+        if type == "buildcompleted": result.type = EventTypes.BuildCompleted
+
+        # if this is a message, transalte the "importance" value into ints.
+        if result.type == EventTypes.BuildMessage:
+            if result["importance"] == "Low": result["importance"] = MessageImportance.Low
+            if result["importance"] == "Medium": result["importance"] = MessageImportance.Medium
+            if result["importance"] == "High": result["importance"] = MessageImportance.High
+            result.importance = result["importance"]
+
+        return result
+
+class BuildEventStore:
+    """Keeps the events of a build in the order they arrived along with the
+    indices of the events of each type (messages by importance) so the events
+    that pass a filter can be found without looking at the rest and the
+    number of errors/warnings is always at hand"""
+    def __init__(self):
+        self.Clear()
+
+    def Clear(self):
+        self.events = []
+        self._indicesByType = {}        # EventTypes -> indices into events
+        self._indicesByImportance = {}  # MessageImportance -> indices of BuildMessages
+
+    def Add(self, e):
+        index = len(self.events)
+        self.events.append(e)
+        if e.type == EventTypes.BuildMessage:
+            self._indicesByImportance.setdefault(e.importance, []).append(index)
+        self._indicesByType.setdefault(e.type, []).append(index)
+
+    def __len__(self):
+        return len(self.events)
+
+    def __getitem__(self, i):
+        return self.events[i]
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def Count(self, type):
+        """Number of events of the given type (e.g. EventTypes.BuildError)"""
+        return len(self._indicesByType.get(type, ()))
+
+    def CountMessages(self, minimportance):
+        """Number of BuildMessages with at least the given importance"""
+        return sum(len(v) for k, v in self._indicesByImportance.iteritems() if k >= minimportance)
+
+    def Select(self, types, minimportance=None, start=0):
+        """Returns the events from index start on whose type is in types,
+        BuildMessages are also filtered by importance (if minimportance is not
+        None), in the order they arrived"""
+        lists = []
+        for type in types:
+            if type == EventTypes.BuildMessage and minimportance != None:
+                lists.extend(v for k, v in self._indicesByImportance.iteritems() if k >= minimportance)
+            elif type in self._indicesByType:
+                lists.append(self._indicesByType[type])
+
+        # Only the tail of each list is wanted when rendering the new events
+        if start > 0:
+            lists = [l[bisect.bisect_left(l, start):] for l in lists]
+
+        if len(lists) == 1:
+            indices = lists[0]
+        else:
+            indices = heapq.merge(*lists)
+        events = self.events
+        return [events[i] for i in indices]
+
+class BuildEventDecoder:
+    """Splits the output of msbuild into events as it's read, line by line.
+    The logger writes one json object per event, either on a single line
+    (NDJSON) or pretty printed over several lines, and msbuild mixes its own
+    plain text lines in between. Lines are only joined and decoded when they
+    could end an object (i.e. they end with a closing bracket) so big events
+    don't get decoded over and over, and anything that isn't part of an
+    object becomes a RawMessage without breaking the events that follow"""
+
+    # Give up on an object that has been open for this many lines
+    MaxPendingLines = 10000
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._pending = []      # Lines of the object being read, if any
+
+    def Feed(self, line):
+        """Returns the list of events completed by the given line"""
+        events = []
+        stripped = line.strip()
+
+        if self._pending:
+            # Objects start at the beginning of a line and everything inside a
+            # pretty printed one is indented (but the closing bracket), so any
+            # other line means the one being read was never going to be complete.
+            inside = line[:1].isspace() or line.startswith("}")
+            if not inside or len(self._pending) >= BuildEventDecoder.MaxPendingLines:
+                self.__FlushPending(events)
+            else:
+                self._pending.append(line)
+                if stripped.endswith("}"):
+                    self.__DecodePending(events)
+                return events
+
+        if stripped == "":
+            return events
+
+        if not stripped.startswith("{"):
+            events.append(BuildEvent.FromRawMessage(line.rstrip("\r\n")))
+            return events
+
+        self._pending.append(line)
+        if stripped.endswith("}"):
+            self.__DecodePending(events)
+        return events
+
+    def Flush(self):
+        """Returns whatever was left without an end (call it at the end of the output)"""
+        events = []
+        self.__FlushPending(events)
+        return events
+
+    def __DecodePending(self, events):
+        text = "".join(self._pending)
+        start = len(text) - len(text.lstrip())
+        try:
+            values, end = self._decoder.raw_decode(text, start)
+        except ValueError:
+            return      # Not complete yet
+        if not isinstance(values, dict) or text[end:].strip() != "":
+            return      # Keep reading, it will be flushed if it never makes sense
+        if not BuildEvent.IsEvent(values):
+            self.__FlushPending(events)     # Some json the logger didn't write
+            return
+        self._pending = []
+        events.append(BuildEvent.FromValues(values))
+
+    def __FlushPending(self, events):
+        """Turns the lines of an object that couldn't be decoded into raw messages"""
+        for line in self._pending:
+            if line.strip() != "":
+                events.append(BuildEvent.FromRawMessage(line.rstrip("\r\n")))
+        self._pending = []
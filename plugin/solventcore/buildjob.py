@@ -0,0 +1,121 @@
+import time
+
+class JobStates:
+    Queued          = 0
+    Running         = 1
+    Finished        = 2
+    Cancelled       = 3
+
+    Names = ["queued", "running", "finished", "cancelled"]
+
+class BuildJob:
+    """A build requested by the user. Waves is None to build the whole
+    solution, otherwise the lists of ProjectDefs to build one after another
+    (see Builder.BuildWaves)"""
+    def __init__(self, target, waves=None):
+        self.id = 0             # Set by the scheduler
+        self.target = target
+        self.waves = waves
+        self.state = JobStates.Queued
+        self.requests = 1       # How many requests ended up in this job (see BuildScheduler.Submit)
+        self.queuedtime = time.time()
+        self.starttime = None
+        self.endtime = None
+        self.exitcode = None    # The first non zero exit code of its processes, if any
+
+        if waves == None:
+            self.key = (target, None)
+            self.name = "solution"
+        else:
+            uuids = tuple(d.uuid for wave in waves for d in wave)
+            self.key = (target, uuids)
+            names = [d.name for wave in waves for d in wave]
+            self.name = names[0] if names else "nothing"
+            if len(names) > 1:
+                self.name += " and %d more" % (len(names) - 1)
+
+    def Covers(self, other):
+        """Whether building this job builds everything the other one would"""
+        return self.target == other.target and (self.waves == None or self.key == other.key)
+
+    def GetDuration(self):
+        """Seconds it's been running (or ran), None if it didn't start"""
+        if self.starttime == None:
+            return None
+        return (self.endtime or time.time()) - self.starttime
+
+    def GetSummary(self):
+        summary = "Job #%d %s (%s): %s" % (self.id, self.target, self.name, JobStates.Names[self.state])
+        duration = self.GetDuration()
+        if duration != None:
+            summary += " %.1fs" % duration
+        if self.state == JobStates.Finished and self.exitcode != None:
+            summary += ", exit code %d" % self.exitcode
+        return summary
+
+class BuildScheduler:
+    """Keeps the build jobs: the one running and the ones waiting for it, in
+    the order they were requested. Requests for something that's already
+    waiting to be built are merged into the waiting job so saving a few files
+    in a row (see g:solvent_build_on_save) builds once. The job running is
+    never merged into, whatever it's building might have changed since it
+    started"""
+
+    # How many finished jobs are remembered
+    HistorySize = 10
+
+    def __init__(self):
+        self.running = None
+        self.queued = []
+        self.finished = []      # Most recent last
+        self._nextId = 1
+
+    def Submit(self, job):
+        """Queues the job, returns the job that will do the work which is not
+        the given one if it was merged into a queued one"""
+        for queued in self.queued:
+            if queued.Covers(job):
+                queued.requests += job.requests
+                return queued
+
+        # Whatever the new job covers doesn't need to wait anymore
+        for queued in [q for q in self.queued if job.Covers(q)]:
+            job.requests += queued.requests
+            self.queued.remove(queued)
+
+        job.id = self._nextId
+        self._nextId += 1
+        self.queued.append(job)
+        return job
+
+    def Next(self):
+        """Starts the next queued job and returns it, None if there's a job
+        running already or nothing is queued"""
+        if self.running != None or not self.queued:
+            return None
+        self.running = self.queued.pop(0)
+        self.running.state = JobStates.Running
+        self.running.starttime = time.time()
+        return self.running
+
+    def Finish(self, cancelled=False):
+        """Marks the running job as done"""
+        job = self.running
+        if job == None:
+            return
+        job.state = JobStates.Cancelled if cancelled else JobStates.Finished
+        job.endtime = time.time()
+        self.running = None
+        self.finished = self.finished[-(BuildScheduler.HistorySize - 1):] + [job]
+
+    def CancelQueued(self):
+        for job in self.queued:
+            job.state = JobStates.Cancelled
+        self.finished = (self.finished + self.queued)[-BuildScheduler.HistorySize:]
+        self.queued = []
+
+    def GetLast(self):
+        """The job running or the last one that finished, None if there's none"""
+        if self.running != None:
+            return self.running
+        return self.finished[-1] if self.finished else None
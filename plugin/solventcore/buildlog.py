@@ -0,0 +1,118 @@
+import os
+import os.path
+import json
+import time
+import threading
+from host import Host
+from buildevent import BuildEvent
+
+class BuildLog:
+    """Writes the events of a build to a file as they arrive so the build can
+    be looked at (or replayed, see BuildLogReplay) after vim is closed. The
+    file has one json array per line: the seconds since the build started
+    and the values of the event"""
+
+    # Bump this whenever the format of the log changes
+    Version = 1
+
+    def __init__(self, path, target):
+        self.path = path
+        self.starttime = time.time()
+        self._lock = threading.Lock()   # Both file monitors write to the log
+        self._file = open(path, "wb")
+        header = {"version": BuildLog.Version, "target": target, "started": time.strftime("%Y-%m-%d %H:%M:%S")}
+        self._file.write(json.dumps(header) + "\n")
+        self._file.flush()
+
+    @staticmethod
+    def Create(solutionPath, target, keep):
+        """Returns a new log in the <solution>.solvent-logs directory, only the
+        last keep logs are kept. Returns None if keep is 0 or the log can't
+        be created"""
+        if keep <= 0:
+            return None
+        directory = solutionPath + ".solvent-logs"
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+
+            # The names sort by date so the oldest ones are first
+            logs = sorted(f for f in os.listdir(directory) if f.endswith(".log"))
+            for f in logs[:max(0, len(logs) - keep + 1)]:
+                os.remove(os.path.join(directory, f))
+
+            name = time.strftime("%Y%m%d-%H%M%S-") + target
+            path = os.path.join(directory, name + ".log")
+            count = 1
+            while os.path.exists(path):
+                path = os.path.join(directory, "%s-%d.log" % (name, count))
+                count += 1
+            return BuildLog(path, target)
+        except (IOError, OSError) as e:
+            Host.Print("The build log could not be created in \"" + directory + "\":")
+            Host.Print(e)
+            return None
+
+    def Write(self, events):
+        """Appends the events to the log, can be called from any thread"""
+        with self._lock:
+            if self._file == None:
+                return
+            elapsed = round(time.time() - self.starttime, 3)
+            lines = []
+            for e in events:
+                # The short message is made up again when the event is read
+                values = dict((k, v) for k, v in e.values.iteritems() if k != "shortmessage")
+                lines.append(json.dumps([elapsed, values], separators=(",", ":")) + "\n")
+            self._file.write("".join(lines))
+            self._file.flush()  # So whatever was written survives vim closing mid build
+
+    def Close(self):
+        with self._lock:
+            if self._file != None:
+                self._file.close()
+                self._file = None
+
+class BuildLogReplay:
+    """Reads a log written by BuildLog and puts its events in the queue from
+    a background thread, either as fast as they can be read or with the same
+    timing they had during the build"""
+    def __init__(self, path, queue, realtime=False):
+        self.path = path
+        self.outputqueue = queue
+        self.realtime = realtime
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self.__Replay)
+        self.thread.daemon = True    # So this thread dies with vim
+        self.thread.start()
+
+    def Stop(self):
+        self._stop.set()
+
+    def __Replay(self):
+        try:
+            with open(self.path, "rb") as f:
+                header = json.loads(f.readline())
+                if not isinstance(header, dict) or header.get("version") != BuildLog.Version:
+                    Host.Print("\"" + self.path + "\" is not a build log solvent can read")
+                    return
+
+                start = time.time()
+                for line in f:
+                    if self._stop.is_set():
+                        return
+                    try:
+                        elapsed, values = json.loads(line)
+                    except ValueError:
+                        break   # The build didn't get to write the whole line
+                    if not BuildEvent.IsEvent(values):
+                        continue
+                    if self.realtime:
+                        wait = start + elapsed - time.time()
+                        if wait > 0 and self._stop.wait(wait):
+                            return
+                    self.outputqueue.put(BuildEvent.FromValues(values))
+                    Host.TriggerUpdate()
+        except (IOError, ValueError) as e:
+            Host.Print("Couldn't replay the build log \"" + self.path + "\":")
+            Host.Print(e)
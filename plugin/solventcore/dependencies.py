@@ -0,0 +1,86 @@
+import os.path
+from project import ProjectContents
+
+def NormalizePath(path):
+    """Returns the path as paths are compared: absolute, normalized and in
+    lowercase, whatever kind of slashes it had"""
+    return os.path.normpath(os.path.abspath(path.replace("\\", "/"))).lower()
+
+class DependencyGraph:
+    """Which projects of a solution depend on which, taken from the
+    ProjectDependencies sections of the sln and the ProjectReference items
+    of the project files. Projects are identified by their uuid"""
+    def __init__(self, solution):
+        self.solution = solution
+        self.dependencies = {}  # uuid -> set of the uuids it depends on
+        self.dependents = {}    # uuid -> set of the uuids that depend on it
+
+        # References have the uuid in any case, or only the path
+        uuids = {}
+        uuidsByPath = {}
+        for d in solution.projectDefs:
+            uuids[d.uuid.upper()] = d.uuid
+            uuidsByPath[NormalizePath(d.absolutePath)] = d.uuid
+            self.dependencies[d.uuid] = set()
+            self.dependents[d.uuid] = set()
+
+        for d in solution.projectDefs:
+            for uuid in d.dependencies:
+                self.__AddEdge(d.uuid, uuids.get(uuid.upper()))
+            for path, uuid in self.__GetReferences(d):
+                if uuid in uuids:
+                    self.__AddEdge(d.uuid, uuids[uuid])
+                elif path != None:
+                    self.__AddEdge(d.uuid, uuidsByPath.get(NormalizePath(os.path.join(d.absoluteDirPath, path))))
+
+    def __GetReferences(self, definition):
+        cache = self.solution.cache
+        references = cache.GetReferences(definition)
+        if references == None:
+            references = ProjectContents.ReadReferences(definition)
+            if references == None:
+                return []   # Not cached so it's tried again next time
+            cache.StoreReferences(definition, references)
+        return references
+
+    def __AddEdge(self, uuid, dependency):
+        # References to projects that aren't in the solution are ignored
+        if dependency != None and dependency != uuid:
+            self.dependencies[uuid].add(dependency)
+            self.dependents[dependency].add(uuid)
+
+    def Dependents(self, uuids):
+        """Returns the set of the given projects and all the ones that depend
+        on them, directly or not"""
+        result = set(uuids)
+        pending = list(result)
+        while pending:
+            for dependent in self.dependents[pending.pop()]:
+                if dependent not in result:
+                    result.add(dependent)
+                    pending.append(dependent)
+        return result
+
+    def Waves(self, uuids):
+        """Sorts the given set of projects in waves: the projects of a wave only
+        depend on projects of previous waves (or on projects that aren't
+        given) so the projects of a wave can be built at the same time once
+        the previous waves are built. Projects keep the order of the sln
+        within a wave. Projects in a cycle go in a last wave of their own"""
+        remaining = [d.uuid for d in self.solution.projectDefs if d.uuid in uuids]
+        waiting = dict((u, len(self.dependencies[u] & uuids)) for u in remaining)
+        waves = []
+        while remaining:
+            wave = [u for u in remaining if waiting[u] == 0]
+            if not wave:
+                names = ", ".join(self.solution.GetProjectDefByUUID(u).name for u in remaining)
+                print "WARNING: These projects depend on each other: " + names
+                wave = remaining
+            waves.append(wave)
+            built = set(wave)
+            remaining = [u for u in remaining if u not in built]
+            for u in wave:
+                for dependent in self.dependents[u]:
+                    if dependent in waiting:
+                        waiting[dependent] -= 1
+        return waves
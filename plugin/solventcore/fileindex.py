@@ -0,0 +1,187 @@
+import re
+import binascii
+import itertools
+import operator
+
+# Each possible byte as 8 bytes that are 1 where it has its bits set
+_expandedBytes = ["".join(chr((byte >> bit) & 1) for bit in range(0, 8)) for byte in range(0, 256)]
+
+def _ToBits(ids):
+    """Returns a long with the bits of the given ids set"""
+    if not ids:
+        return 0L
+    bits = bytearray(max(ids) / 8 + 1)
+    for i in ids:
+        bits[i >> 3] |= 1 << (i & 7)
+    bits.reverse()  # Most significant byte first
+    return long(binascii.hexlify(bits), 16)
+
+def _FromBits(bits):
+    """Returns the list of ids whose bits are set in the given long"""
+    if bits == 0:
+        return []
+    hex = "%x" % bits
+    if len(hex) % 2:
+        hex = "0" + hex
+    bytes = bytearray(binascii.unhexlify(hex))
+    bytes.reverse()
+    expanded = bytearray("".join([_expandedBytes[byte] for byte in bytes]))
+    return list(itertools.compress(xrange(len(expanded)), expanded))
+
+def _Pick(values, ids):
+    """[values[i] for i in ids] without a loop in python"""
+    if len(ids) < 2:
+        return [values[i] for i in ids]
+    return operator.itemgetter(*ids)(values)
+
+class FileIndex:
+    """Index of the files of a solution for fuzzy searching (see :SolventFind).
+    A query matches a file if its characters show up in the file's path in
+    the same order. For each character the index keeps a bitmap (a long) of
+    the files whose path contains it so the files that have all the
+    characters of a query are found with a few ANDs, only those are matched
+    against the query. Files are indexed per project so a project that is
+    loaded again only needs its own files indexed again.
+
+    The matches are ranked without looking at them one by one in python:
+    first the ones with the query right in the filename, then the ones whose
+    filename matches the query and then the rest, shorter paths first"""
+
+    # How many matches are ranked at a time (see Find)
+    ChunkSize = 2000
+
+    # Matches are sorted by a single int with the length of the path in the
+    # high bits and the id in these low bits, that's much faster than a key
+    IdBits = 24
+
+    def __init__(self):
+        self.files = []         # id -> File, None if the id is free
+        self.paths = []         # id -> what queries are matched against
+        self.names = []         # id -> filename part of the path
+        self.sortKeys = []      # id -> length of the path and the id in one int (see Find)
+        self._free = []         # Ids that can be reused
+        self._bitsByChar = {}   # character -> bitmap of the ids whose path has it
+        self._idsByProject = {} # project id -> ids of its files
+        self._generations = {}  # project id -> generation of the project when it was indexed
+        self.generation = -1    # Generation of the solution the index is up to date with
+
+        # The last query and what it matched (see Find)
+        self._lastQuery = None
+        self._lastMatches = None
+
+    def Update(self, solution):
+        """Indexes the files of the projects that were (re)loaded since the
+        last time the index was updated"""
+        if self.generation == solution.generation:
+            return
+        for p in solution.projects:
+            if self._generations.get(p.id) != p.generation:
+                self.RemoveProject(p.id)
+                self.AddProject(p)
+        self.generation = solution.generation
+
+    def AddProject(self, project):
+        ids = []
+        idsByChar = {}
+        for f in project.files:
+            if self._free:
+                id = self._free.pop()
+            else:
+                id = len(self.files)
+                self.files.append(None)
+                self.paths.append(None)
+                self.names.append(None)
+                self.sortKeys.append(0)
+
+            # Queries are matched ignoring case and the kind of slashes
+            path = f.relativePath.lower().replace("\\", "/")
+            self.files[id] = f
+            self.paths[id] = path
+            self.names[id] = path[path.rfind("/") + 1:]
+            self.sortKeys[id] = (len(path) << FileIndex.IdBits) | id
+            ids.append(id)
+            for c in set(path):
+                idsByChar.setdefault(c, []).append(id)
+
+        # One OR per character instead of one per file and character
+        for c, charIds in idsByChar.iteritems():
+            self._bitsByChar[c] = self._bitsByChar.get(c, 0L) | _ToBits(charIds)
+
+        self._idsByProject[project.id] = ids
+        self._generations[project.id] = project.generation
+        self._lastQuery = None
+
+    def RemoveProject(self, projectId):
+        ids = self._idsByProject.pop(projectId, None)
+        self._generations.pop(projectId, None)
+        if not ids:
+            return
+        mask = ~_ToBits(ids)
+        for c in self._bitsByChar.keys():
+            self._bitsByChar[c] &= mask
+        for id in ids:
+            self.files[id] = None
+            self.paths[id] = None
+            self.names[id] = None
+        self._free.extend(ids)
+        self._lastQuery = None
+
+    def Find(self, query, limit):
+        """Returns the (at most) limit best matching Files for the query, the
+        best match first. When the query extends the last one only the files
+        that matched the last query are looked at"""
+        query = query.lower().replace("\\", "/").replace(" ", "")
+        if query == "":
+            self._lastQuery = None
+            return []
+
+        if self._lastQuery != None and query.startswith(self._lastQuery):
+            candidates = self._lastMatches
+        else:
+            bits = None
+            for c in set(query):
+                bits = self._bitsByChar.get(c, 0L) if bits == None else bits & self._bitsByChar.get(c, 0L)
+                if bits == 0:
+                    break
+            candidates = _FromBits(bits)
+
+        # Each gap stops at the first occurrence of the next character so
+        # there's no backtracking, the first way to match is as good as any
+        pattern = re.escape(query[0])
+        for c in query[1:]:
+            pattern += "[^%s]*%s" % (re.escape(c), re.escape(c))
+        search = re.compile(pattern).search
+        paths = self.paths
+        names = self.names
+
+        # map and compress keep the loops over the candidates out of python.
+        # A single character is already known to be in all of them.
+        if len(query) > 1:
+            candidates = list(itertools.compress(candidates, map(search, _Pick(paths, candidates))))
+        matches = candidates
+        self._lastQuery = query
+        self._lastMatches = matches
+
+        # Shorter paths first (ties are broken by the order the files were
+        # indexed), taking first the ones with the query right in the filename,
+        # then the ones whose filename matches the query and then the rest.
+        # Usually there are enough of the first ones among the shortest paths
+        # so they're looked at in chunks until there are enough.
+        ordered = sorted(_Pick(self.sortKeys, matches))
+        mask = (1 << FileIndex.IdBits) - 1
+        exact = re.compile(re.escape(query)).search
+        result = []
+        taken = set()
+        tests = (exact, search, None) if "/" not in query else (None,)    # No filename has a slash
+        for test in tests:
+            for start in xrange(0, len(ordered), FileIndex.ChunkSize):
+                chunk = [key & mask for key in ordered[start:start + FileIndex.ChunkSize]]
+                if test != None:
+                    chunk = itertools.compress(chunk, map(test, _Pick(names, chunk)))
+                for id in chunk:
+                    if id not in taken:
+                        result.append(id)
+                        taken.add(id)
+                        if len(result) == limit:
+                            return [self.files[id] for id in result]
+        return [self.files[id] for id in result]
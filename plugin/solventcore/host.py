@@ -0,0 +1,45 @@
+class Host:
+    """What the core needs from the program it runs in. Inside vim the plugin
+    hands everything over to VimUtil (see Use), anywhere else (e.g. python -m
+    solventcore) settings are taken from Host.settings, messages are printed
+    and there's no event loop to wake up so whoever uses the core calls the
+    UpdateAsync methods when it sees fit"""
+
+    # name -> value, the same names as the g:solvent_<name> variables
+    settings = {}
+
+    _adapter = None
+
+    @staticmethod
+    def Use(adapter):
+        """Makes the core go through adapter, which has the same static
+        methods as Host (i.e. VimUtil)"""
+        Host._adapter = adapter
+
+    @staticmethod
+    def GetSetting(name, default):
+        if Host._adapter != None:
+            return Host._adapter.GetSetting(name, default)
+        return Host.settings.get(name, default)
+
+    @staticmethod
+    def Print(text):
+        """Shows a message, can be called from any thread"""
+        if Host._adapter != None:
+            Host._adapter.Print(text)
+        else:
+            print text
+
+    @staticmethod
+    def TriggerUpdate():
+        """Called from background threads when there's something for the
+        UpdateAsync methods to do"""
+        if Host._adapter != None:
+            Host._adapter.TriggerUpdate()
+
+    @staticmethod
+    def OpenFile(path):
+        if Host._adapter != None:
+            Host._adapter.OpenFile(path)
+        else:
+            print path
@@ -0,0 +1,212 @@
+import os
+import os.path
+import zlib
+import atexit
+import threading
+import marshal
+from project import ProjectDef, ProjectContents
+from host import Host
+
+# Caches with a SaveLater pending, they're saved on exit instead of by a
+# timer that would go off while python is shutting down
+_pending = set()
+_pendingLock = threading.Lock()
+
+@atexit.register
+def _FlushPending():
+    with _pendingLock:
+        caches = list(_pending)
+    for cache in caches:
+        cache.Flush()
+
+class ParseCache:
+    """Keeps the parsed contents of a solution and its projects in a file next
+    to the .sln (<solution>.solventcache) so reopening a solution that hasn't
+    changed doesn't need to parse any XML. Every entry is keyed by the path of
+    the file it was read from along with its mtime and size, if any of those
+    change the entry is considered stale and the file is parsed again.
+
+    The file might come along with the solution (e.g. in a shared folder) so
+    it's written with marshal and not pickle, loading it can't run any code.
+    Everything in it is plain tuples, lists, dicts, strings and numbers"""
+
+    # Bump this whenever the format of the cached data changes
+    Version = 3
+
+    # Seconds SaveLater waits, so projects loaded one after the other are saved once
+    SaveDelay = 2.0
+
+    def __init__(self, solutionPath, enabled=True):
+        self.path = solutionPath + ".solventcache"
+        self.enabled = enabled
+        self.solution = None    # (stamp, packed solution data)
+        self.projects = {}      # absolute project path -> (stamps, items)
+        self.references = {}    # absolute project path -> (stamp, references)
+        self.dirty = False
+
+        # Projects might be stored from the loader's background thread
+        self._lock = threading.RLock()
+        self._saveLock = threading.Lock()  # Only one Save writes the file at a time
+        self._timer = None                  # Pending SaveLater
+
+        if self.enabled:
+            self.__Load()
+
+    @staticmethod
+    def Stamp(path):
+        """Returns the (mtime, size) of a file or None if it doesn't exist"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    @staticmethod
+    def ProjectStamps(definition):
+        """Stamps of the files a project could be read from (the .filters file
+        is preferred but the project falls back to the .vcxproj)"""
+        return (ParseCache.Stamp(definition.absolutePath + ".filters"), ParseCache.Stamp(definition.absolutePath))
+
+    def RestoreSolution(self, solution):
+        """Fills in the solution's definitions and configuration data from the
+        cache. Returns False if there's nothing cached for it or the .sln has
+        changed since"""
+        if self.solution == None:
+            return False
+        stamp, packed = self.solution
+        if stamp != ParseCache.Stamp(solution.absolutePath):
+            return False
+
+        formatVersion, configurations, platforms, definitions = packed
+        solution.formatVersion = formatVersion
+        solution.configurations = list(configurations)
+        solution.platforms = list(platforms)
+        solution.projectDefs = [ProjectDef.Unpack(solution, d) for d in definitions]
+        solution._projectDefsByUUID = dict((d.uuid, d) for d in solution.projectDefs)
+        return True
+
+    def StoreSolution(self, solution):
+        if not self.enabled:
+            return
+        packed = (solution.formatVersion, solution.configurations, solution.platforms,
+                  [d.Pack() for d in solution.projectDefs])
+        with self._lock:
+            self.solution = (ParseCache.Stamp(solution.absolutePath), packed)
+
+            # Forget about projects that are no longer part of the solution
+            paths = set(d.absolutePath for d in solution.projectDefs)
+            for path in self.projects.keys():
+                if path not in paths:
+                    del self.projects[path]
+            for path in self.references.keys():
+                if path not in paths:
+                    del self.references[path]
+            self.dirty = True
+
+    def GetProject(self, definition):
+        """Returns the cached ProjectContents of a project or None if it's not
+        cached or its files have changed"""
+        entry = self.projects.get(definition.absolutePath)
+        if entry == None:
+            return None
+        stamps, items = entry
+        if stamps != ParseCache.ProjectStamps(definition):
+            return None
+        contents = ProjectContents()
+        contents.items = items
+        return contents
+
+    def StoreProject(self, definition, contents):
+        # Errors are not cached, the project will be read again next time
+        if not self.enabled or contents.error != None:
+            return
+        stamps = ParseCache.ProjectStamps(definition)
+        with self._lock:
+            self.projects[definition.absolutePath] = (stamps, contents.items)
+            self.dirty = True
+
+    def GetReferences(self, definition):
+        """Returns the cached project references of a project (see
+        ProjectContents.ReadReferences) or None if they're not cached or the
+        project file has changed"""
+        entry = self.references.get(definition.absolutePath)
+        if entry == None or entry[0] != ParseCache.Stamp(definition.absolutePath):
+            return None
+        return entry[1]
+
+    def StoreReferences(self, definition, references):
+        if not self.enabled:
+            return
+        stamp = ParseCache.Stamp(definition.absolutePath)
+        with self._lock:
+            self.references[definition.absolutePath] = (stamp, references)
+            self.dirty = True
+
+    def Save(self):
+        """Writes the cache to disk if anything changed"""
+        if not self.enabled or not self.dirty:
+            return
+        with self._saveLock:
+            # Only the snapshot is taken with the lock held, the loader's
+            # threads can keep storing projects while it's written
+            with self._lock:
+                data = marshal.dumps((ParseCache.Version, self.solution, self.projects, self.references), 2)
+                self.dirty = False
+            try:
+                # Write to a temporary file first so a half written cache is never read
+                temp = self.path + ".tmp"
+                with open(temp, "wb") as f:
+                    f.write(zlib.compress(data, 1))
+                if os.path.exists(self.path):
+                    os.remove(self.path)    # Windows can't rename over an existing file
+                os.rename(temp, self.path)
+            except Exception as e:
+                self.dirty = True
+                # This might be a background thread (see SaveLater)
+                Host.Print("The solution cache could not be written at \"" + self.path + "\":")
+                Host.Print(e)
+
+    def SaveLater(self):
+        """Saves the cache from a background thread SaveDelay seconds from
+        now, whatever changes in the meantime is saved along. Writing the
+        whole cache takes a while on big solutions so it's not done on the
+        main thread each time a project is loaded"""
+        if not self.enabled or not self.dirty:
+            return
+        with self._lock:
+            if self._timer == None:
+                self._timer = threading.Timer(ParseCache.SaveDelay, self.__SaveLater)
+                self._timer.daemon = True
+                self._timer.start()
+                with _pendingLock:
+                    _pending.add(self)
+
+    def __SaveLater(self):
+        with self._lock:
+            self._timer = None
+        with _pendingLock:
+            _pending.discard(self)
+        self.Save()
+
+    def Flush(self):
+        """Saves right away what SaveLater would save later"""
+        with self._lock:
+            if self._timer != None:
+                self._timer.cancel()
+                self._timer = None
+        with _pendingLock:
+            _pending.discard(self)
+        self.Save()
+
+    def __Load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = marshal.loads(zlib.decompress(f.read()))
+        except Exception:
+            # Missing or corrupt, either way everything will be parsed again
+            return
+        if not isinstance(data, tuple) or len(data) != 4 or data[0] != ParseCache.Version:
+            return
+        self.solution = data[1]
+        self.projects = data[2]
+        self.references = data[3]
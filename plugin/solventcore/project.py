@@ -0,0 +1,330 @@
+try:
+    import xml.etree.cElementTree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+import os.path
+from tree import Folder, File, TreeNode, InternString
+
+class ProjectDef:
+    """Project information as it's read from the sln file"""
+    @staticmethod
+    def TranslateProjectType(type):
+        """Utility function to transform project type UUIDs into a human readable string"""
+        if type == "{2150E333-8FDC-42A3-9474-1A3956D46DE8}":
+            return "general"
+        elif type == "{8BC9CEB8-8B4A-11D0-8D11-00A0C91BC942}":
+            return "cpp"
+        else:
+            print "WARNING: Unknown project type: " + type
+            return "cpp"
+
+    def __init__(self, solution, type, name, path, uuid):
+        self.solution = solution
+        self.typeuuid = type
+        self.type = ProjectDef.TranslateProjectType(type)
+        self.name = name
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.absolutePath = os.path.join(solution.solutionDir, path)
+        self.absoluteDirPath = os.path.dirname(self.absolutePath)
+        self.uuid = uuid
+        self.parentuuid = None
+        self.dependencies = []      # uuids from the ProjectDependencies section of the sln
+        self.configs = []
+        self._configsByKey = {}     # (solutionConfiguration, solutionPlatform) -> ProjectConfiguration
+
+    def GetOrCreateConfig(self, solutionConfiguration, solutionPlatform):
+        config = self._configsByKey.get((solutionConfiguration, solutionPlatform))
+        if config == None:
+            config = ProjectConfiguration(solutionConfiguration, solutionPlatform)
+            self.__AddConfig(config)
+        return config
+
+    def __AddConfig(self, config):
+        self.configs.append(config)
+        self._configsByKey[(config.solutionConfiguration, config.solutionPlatform)] = config
+
+    def Pack(self):
+        """Returns the definition as plain tuples so it can be cached (see ParseCache)"""
+        return (self.typeuuid, self.name, self.path, self.uuid, self.parentuuid,
+                [c.Pack() for c in self.configs], self.dependencies)
+
+    @staticmethod
+    def Unpack(solution, packed):
+        """Creates a ProjectDef from the result of Pack"""
+        typeuuid, name, path, uuid, parentuuid, configs, dependencies = packed
+        definition = ProjectDef(solution, typeuuid, name, path, uuid)
+        definition.parentuuid = parentuuid
+        definition.dependencies = list(dependencies)
+        for c in configs:
+            definition.__AddConfig(ProjectConfiguration.Unpack(c))
+        return definition
+
+class ProjectContents:
+    """The items of a project as they are read from its project file. Reading
+    doesn't touch the tree so it can be done from a worker thread (see
+    ProjectLoader), the tree is built later by Project"""
+    def __init__(self):
+        self.items = []         # (path, filter) tuples, filter is None when the file has none
+        self.error = None       # Whatever went wrong while reading the project file
+        self.xmlns = None
+
+    @staticmethod
+    def Read(definition):
+        """Reads the project file of the given ProjectDef and returns a
+        ProjectContents, errors are stored in the result instead of raised"""
+        contents = ProjectContents()
+
+        # Is there an actual file related to this project?
+        if (definition.type == "general"):
+            pass
+
+        # TODO: Add support for other kinds of projects. Do I need to make a distinction??
+        if (definition.type == "cpp"):
+            try:
+                # First try to open the filter file which is the tree we prefer to show
+                contents.__ReadProjectFile(definition.absolutePath + ".filters")
+            except Exception as e:
+                try:
+                    # Apparently there's no filter file, just open the regular vcxproj
+                    contents.__ReadProjectFile(definition.absolutePath)
+                except Exception as e:
+                    contents.items = []
+                    contents.error = e
+
+        return contents
+
+    @staticmethod
+    def ReadReferences(definition):
+        """Returns the ProjectReference items of the project file as (path,
+        uuid) tuples, the path relative to the project as it's written in the
+        file and the uuid None if the reference doesn't have one, or None if
+        the file can't be read. These are only in the .vcxproj (not in the
+        .filters) so they're read on their own when they're needed (see
+        DependencyGraph)"""
+        references = []
+        if definition.type != "cpp":
+            return references
+        try:
+            for event, elem in ET.iterparse(definition.absolutePath):
+                # The namespace doesn't matter here
+                name = elem.tag[elem.tag.rfind("}") + 1:]
+                if name == "ProjectReference":
+                    uuid = None
+                    for child in elem:
+                        if child.tag[child.tag.rfind("}") + 1:] == "Project" and child.text:
+                            uuid = child.text.strip().upper()
+                    references.append((elem.get("Include"), uuid))
+                if name.endswith("Group"):
+                    elem.clear()    # Nothing else is needed from the groups
+        except Exception as e:
+            print "The project references of " + definition.name + " could not be read:"
+            print e
+            return None
+        return references
+
+    def __ReadProjectFile(self, path):
+        """Reads the items of a project file incrementally. Elements are
+        dropped as soon as they've been read so memory doesn't grow with the
+        size of the file"""
+        self.items = []
+        self.xmlns = None
+        root = None
+        group = None        # The ItemGroup whose items we're reading, if any
+        depth = 0
+
+        for event, elem in ET.iterparse(path, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if root == None:
+                    # Get the namespace since every tag returned by etree is prefixed by it
+                    root = elem
+                    if elem.tag.startswith("{"):
+                        self.xmlns = elem.tag[1:elem.tag.index("}")]
+                    itemGroupTag = self.__Tag("ItemGroup")
+                    filterTag = self.__Tag("Filter")
+                    projectReferenceTag = self.__Tag("ProjectReference")
+                # TODO: Apparently if it doesn't have a label then it's a group of 
+                # files we want to show? There's probably a better way to determine that
+                elif group == None and elem.tag == itemGroupTag and elem.get("Label") == None:
+                    group = elem
+                    groupDepth = depth
+                continue
+
+            if group != None and depth == groupDepth + 1:
+                # Ignore filters since each file's filter specify the same information
+                # Ignore project references (see ReadReferences)
+                # All items I've seen have the Include property but just to make sure
+                if elem.tag != filterTag and elem.tag != projectReferenceTag and elem.get("Include") != None:
+                    self.__ReadFile(elem)
+                group.remove(elem)
+            elif elem is group:
+                group = None
+
+            # Everything below the root has been read by now
+            if depth == 2:
+                root.clear()
+            depth -= 1
+
+    def __Tag(self, name):
+        """Returns the tag name as etree returns it (i.e. prefixed by the namespace)"""
+        if self.xmlns == None:
+            return name
+        return "{%s}%s" % (self.xmlns, name)
+
+    def __ReadFile(self, item):
+        """Reads a file from xml and stores its path along with its filter"""
+        path = item.get("Include")
+        filter = item.find(self.__Tag("Filter"))
+        if filter != None:
+            # Lots of items share the same filter
+            filter = InternString(filter.text)
+        self.items.append((InternString(path), filter))
+
+class Project(Folder):
+    def __init__(self, definition, contents=None, id=-1):
+        """Creates the project tree from the given ProjectContents. Without
+        contents the project is left unloaded (and collapsed) until Load is
+        called, see Solution.LoadProjects"""
+        Folder.__init__(self, definition.name)
+        self.id = id    # Unique within the solution, different projects might use the same name
+        self.definition = definition
+        self.solution = definition.solution
+        self.files = []
+        self.configurations = []
+        self.loaded = False
+        self.generation = 0     # Solution.generation when the project was last loaded
+        self.pending = True     # Whether the contents haven't been loaded yet
+        self.loading = False    # Whether the contents are being read in the background
+
+        if contents != None:
+            self.Load(contents)
+        else:
+            self.expanded = False
+
+    def Load(self, contents):
+        """Builds the project tree from the given ProjectContents"""
+        #print "Loading " + definition.type + " project at: " + definition.absolutePath
+        definition = self.definition
+        self.pending = False
+        self.loading = False
+
+        if contents.error != None:
+            print "Project " + definition.name + " could not be opened at \"" + definition.absolutePath + "\". Skipping."
+            print contents.error
+            self.loaded = False
+            return
+
+        for path, filter in contents.items:
+            self.__AddFile(path, filter)
+
+        self.loaded = True
+        self.solution.generation += 1
+        self.generation = self.solution.generation
+
+    def Reload(self, contents):
+        """Builds the project tree again from the given ProjectContents (e.g.
+        after its files changed), folders that are still there keep their
+        expanded state"""
+        expanded = {}
+        self.__SaveExpanded(self, (), expanded)
+        self.RemoveAllChildren()
+        self.files = []
+        self.Load(contents)
+        self.__RestoreExpanded(self, (), expanded)
+
+    def __SaveExpanded(self, folder, path, expanded):
+        for c in folder.children:
+            if isinstance(c, Folder):
+                childPath = path + (c.name,)
+                expanded[childPath] = c.expanded
+                self.__SaveExpanded(c, childPath, expanded)
+
+    def __RestoreExpanded(self, folder, path, expanded):
+        for c in folder.children:
+            if isinstance(c, Folder):
+                childPath = path + (c.name,)
+                c.expanded = expanded.get(childPath, c.expanded)
+                self.__RestoreExpanded(c, childPath, expanded)
+
+    def HasChildren(self):
+        # Projects that haven't been loaded yet might have children
+        return self.pending or Folder.HasChildren(self)
+
+    def PerformAction(self, action):
+        Folder.PerformAction(self, action)
+
+        # Projects that are loaded lazily are read the first time they're expanded
+        if self.expanded and self.pending:
+            self.solution.LoadProjects([self])
+
+    def __AddFile(self, path, filter):
+        """Creates a File object in the right folder (according to its filter)"""
+        if filter != None:
+            folder = self.__GetOrCreateFolder(filter)
+        else:
+            folder = self
+
+        file = File(self, path)
+        folder.AddChild(file)
+        self.files.append(file)
+
+    def __GetOrCreateFolder(self, path):
+        folders = path.split("\\")
+        node = self
+        for folderName in folders:
+            child = node.GetChildByName(folderName)
+            if child == None:
+                child = Folder(InternString(folderName))
+                node.AddChild(child)
+            node = child
+        return node
+
+    def GetProjectId(self):
+        """Returns the project id of this project, we need an id because 
+        different projects might use the same name"""
+        return self.id
+
+    def GetNodeName(self):
+        conf = self.definition.GetOrCreateConfig(self.solution.configuration.GetSelected(), self.solution.platform.GetSelected())
+        if self.definition.type != "general":
+            if self.loading:
+                return "[%s] (loading...)" % self.definition.name
+            elif conf.builds:
+                return "[%s] (%s|%s)" % (self.definition.name, conf.configuration, conf.platform)
+            else:
+                return "[%s] (won't build)" % self.definition.name
+        else:
+            return "[%s]" % self.definition.name
+
+    def IndentsChildren(self):
+        return True
+
+class ProjectConfiguration():
+    def __init__(self, solutionConfiguration, solutionPlatform):
+        self.solutionConfiguration = solutionConfiguration
+        self.solutionPlatform = solutionPlatform
+        self.builds = False
+
+    def SetProjectConfig(self, configuration, platform):
+        """The values for $(Platform) and $(Configuration) for this solution config"""
+        self.configuration = configuration
+        self.platform = platform
+
+    def Enable(self):
+        """Whether the project builds for this solution configuration"""
+        self.builds = True
+
+    def Pack(self):
+        return (self.solutionConfiguration, self.solutionPlatform,
+                getattr(self, "configuration", None), getattr(self, "platform", None), self.builds)
+
+    @staticmethod
+    def Unpack(packed):
+        solutionConfiguration, solutionPlatform, configuration, platform, builds = packed
+        config = ProjectConfiguration(solutionConfiguration, solutionPlatform)
+        if configuration != None:
+            config.SetProjectConfig(configuration, platform)
+        config.builds = builds
+        return config
+
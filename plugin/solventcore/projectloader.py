@@ -0,0 +1,88 @@
+import threading
+import Queue
+from project import ProjectContents
+
+class ProjectLoader:
+    """Reads the project files of a solution, one after another unless more
+    workers are asked for. Only the reading is done here (see
+    ProjectContents), the tree itself is still built by the caller so the
+    resulting hierarchy is the same either way. If a ParseCache is
+    provided, only the projects that are not cached (or stale) are read.
+
+    Workers are threads, and parsing the XML holds the GIL, so they don't
+    parse in parallel. They only help when reading the files waits a lot
+    (e.g. a solution on a network share)"""
+    def __init__(self, workers, cache=None):
+        self.workers = max(1, workers)
+        self.cache = cache
+
+        # Projects waiting to be read by the background thread
+        self._background = Queue.Queue()
+        self._backgroundThread = None
+        self._lock = threading.Lock()
+
+    def ReadInBackground(self, definitions, done):
+        """Queues the ProjectDefs to be read by a background thread, done is
+        called from that thread with each ProjectDef and its ProjectContents"""
+        with self._lock:
+            for d in definitions:
+                self._background.put((d, done))
+            if self._backgroundThread == None:
+                self._backgroundThread = threading.Thread(target=self.__BackgroundWork)
+                self._backgroundThread.daemon = True    # So this thread dies with vim
+                self._backgroundThread.start()
+
+    def ReadAll(self, definitions):
+        """Returns a list with the ProjectContents of each ProjectDef in the
+        same order as they were passed in"""
+        if self.cache == None:
+            return self.__ReadAll(definitions)
+
+        results = [self.cache.GetProject(d) for d in definitions]
+        stale = [i for i in range(0, len(definitions)) if results[i] == None]
+        read = self.__ReadAll([definitions[i] for i in stale])
+        for i, contents in zip(stale, read):
+            self.cache.StoreProject(definitions[i], contents)
+            results[i] = contents
+        return results
+
+    def __ReadAll(self, definitions):
+        results = [None] * len(definitions)
+
+        # Not worth starting any threads
+        if self.workers == 1 or len(definitions) <= 1:
+            for i in range(0, len(definitions)):
+                results[i] = ProjectContents.Read(definitions[i])
+            return results
+
+        pending = Queue.Queue()
+        for i in range(0, len(definitions)):
+            pending.put(i)
+
+        threads = []
+        for i in range(0, min(self.workers, len(definitions))):
+            thread = threading.Thread(target=self.__Work, args=(pending, definitions, results))
+            thread.daemon = True    # So this thread dies with vim
+            thread.start()
+            threads.append(thread)
+
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def __BackgroundWork(self):
+        """Reads the projects queued by ReadInBackground one at a time"""
+        while True:
+            definition, done = self._background.get()
+            done(definition, self.ReadAll([definition])[0])
+
+    def __Work(self, pending, definitions, results):
+        """Reads projects until there are none left"""
+        while True:
+            try:
+                i = pending.get_nowait()
+            except Queue.Empty:
+                return
+            # Each worker writes to different slots so no locking is needed
+            results[i] = ProjectContents.Read(definitions[i])
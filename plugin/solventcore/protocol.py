@@ -0,0 +1,50 @@
+import json
+import threading
+
+class Connection:
+    """One end of the pipes between the plugin and the model server (see
+    server.py). Every message is a line of compact JSON:
+
+        [id, method, args]      a request, args is a list
+        [id, result]            the answer to request id
+        [id, None, error]       the request failed, error is a message
+        [0, event, args]        something the server wants to tell (e.g. a
+                                project was loaded again), ids start at 1
+
+    Answers come in the same order as the requests, events can be in
+    between"""
+
+    def __init__(self, input, output):
+        self.input = input
+        self.output = output
+        self._lock = threading.Lock()   # Events are sent from other threads
+
+    def Send(self, message):
+        """Writes a message, returns False if the other end is gone"""
+        data = json.dumps(message, separators=(",", ":")) + "\n"
+        with self._lock:
+            try:
+                self.output.write(data)
+                self.output.flush()
+            except (IOError, OSError, ValueError):
+                return False
+        return True
+
+    def Receive(self):
+        """Waits for the next message, returns None once the other end is gone"""
+        while True:
+            try:
+                line = self.input.readline()
+            except (IOError, OSError, ValueError):
+                return None
+            if line == "":
+                return None
+            if line.strip() != "":
+                return json.loads(line)
+
+    def Close(self):
+        for f in (self.output, self.input):
+            try:
+                f.close()
+            except (IOError, OSError):
+                pass
@@ -0,0 +1,205 @@
+import os.path
+import sys
+import threading
+import traceback
+import Queue
+from host import Host
+from solution import Solution
+from treelines import TreeLines
+from fileindex import FileIndex
+from protocol import Connection
+
+class SolutionServer:
+    """Keeps a solution in a process of its own so vim doesn't have to, see
+    g:solvent_model_server. The plugin asks for what it needs to show through
+    a Connection (see protocol.py), everything is answered here by a single
+    thread that owns the model, the same way vim's main thread owns it when
+    the plugin keeps the solution itself. Background work (loading projects,
+    watching files) wakes that thread up through Host.TriggerUpdate.
+
+    The lines of the tree view are the ones of a TreeLines. Every change to
+    them (an action or a project loaded in the background) bumps version and
+    is sent as the lines that changed, so the plugin only keeps its buffer.
+    Actions carry the version the plugin had, those meant for older lines
+    are ignored since they'd be performed on the wrong node"""
+
+    def __init__(self, input, output):
+        self.connection = Connection(input, output)
+        self.queue = Queue.Queue()
+        self.settings = {}
+        self.solution = None
+        self.lines = None
+        self.index = FileIndex()
+        self.version = 0
+        self.running = False
+        self.methods = {
+            "open": self.Open,
+            "action": self.Action,
+            "find": self.Find,
+            "files": self.Files,
+            "affected": self.Affected,
+            "close": self.Close,
+            }
+
+    def Run(self):
+        """Answers requests until the plugin closes the connection"""
+        # The core talks to the plugin through here (see the Host methods
+        # below). Anything printed goes to the plugin too, stdout is where
+        # the messages go.
+        Host.Use(self)
+        stdout = sys.stdout
+        sys.stdout = _PrintForwarder(self)
+
+        thread = threading.Thread(target=self.__Read)
+        thread.daemon = True
+        thread.start()
+
+        self.running = True
+        try:
+            while self.running:
+                message = self.queue.get()
+                if message == None:
+                    break       # The plugin is gone
+                if message == "update":
+                    self.__Update()
+                else:
+                    self.__Answer(message)
+        finally:
+            if self.solution != None:
+                self.solution.Close()
+            sys.stdout = stdout
+
+    def __Read(self):
+        while True:
+            message = self.connection.Receive()
+            self.queue.put(message)
+            if message == None:
+                return
+
+    def __Answer(self, message):
+        id, method, args = message
+        try:
+            if method not in self.methods:
+                raise ValueError("Unknown request " + method)
+            if self.solution == None and method not in ("open", "close"):
+                raise IOError("No solution is open")
+            self.connection.Send([id, self.methods[method](*args)])
+        except Exception as e:
+            self.connection.Send([id, None, "%s: %s" % (type(e).__name__, e)])
+            traceback.print_exc(file=sys.stderr)
+
+    def __Update(self):
+        """Loads the projects that were read in the background and sends the
+        lines that changed because of them"""
+        if self.solution == None:
+            return
+        projects = self.solution.UpdateAsync()
+        if projects:
+            for change in self.lines.FlattenReloaded(projects):
+                self.version += 1
+                self.connection.Send([0, "lines", [self.version] + list(change)])
+
+    def __GetState(self):
+        s = self.solution
+        return {"version": self.version, "configuration": s.configuration.selectedIndex, "platform": s.platform.selectedIndex}
+
+    # Requests
+
+    def Open(self, path, settings):
+        """Opens the solution (the g:solvent_ settings the core reads come
+        along), returns every line of the tree"""
+        if self.solution != None:
+            self.solution.Close()
+        self.settings = settings
+        self.solution = Solution(path)
+        if not hasattr(self.solution, "projects"):
+            self.solution = None
+            raise IOError("Couldn't read \"%s\"" % path)
+        self.lines = TreeLines(self.solution)
+        self.index = FileIndex()
+        self.version += 1
+        state = self.__GetState()
+        state.update({"lines": self.lines.Flatten(), "buildable": self.solution.buildable,
+                      "configurations": self.solution.configurations, "platforms": self.solution.platforms})
+        return state
+
+    def Action(self, version, index, actions):
+        """Performs the actions one after the other on the node of the given
+        line (see TreeLines.PerformAction), returns the lines that changed
+        with each one as start, end and the new lines. Returns None if the
+        lines changed since the plugin got them"""
+        if version != self.version:
+            return None
+        changes = []
+        for action in actions:
+            change = self.lines.PerformAction(index, action)
+            if change != None:
+                changes.append(change)
+        if changes:
+            self.version += 1
+        state = self.__GetState()
+        state["changes"] = changes
+        return state
+
+    def Find(self, query, limit):
+        """The files that best match the query (see FileIndex) as relative
+        path, project name and absolute path"""
+        # Every file is a candidate so lazily loaded projects must be read now
+        self.solution.LoadProjects(self.solution.projects, wait=True)
+        self.index.Update(self.solution)
+        return [_DescribeFile(f) for f in self.index.Find(query, limit)]
+
+    def Files(self, generation):
+        """Every file of the solution as name, id and files of each project
+        (see Find), None if no project was loaded since generation"""
+        s = self.solution
+        s.LoadProjects(s.projects, wait=True)
+        if generation == s.generation:
+            return None
+        return {"generation": s.generation,
+                "projects": [[p.definition.name, p.id, [_DescribeFile(f) for f in p.files]] for p in s.projects]}
+
+    def Affected(self, path):
+        """The projects BuildAffected would build for the file at path, as
+        waves of packed ProjectDefs (see ProjectDef.Pack). None if no project
+        has the file"""
+        waves = self.solution.GetAffected(path)
+        if waves == None:
+            return None
+        return [[d.Pack() for d in wave] for wave in waves]
+
+    def Close(self):
+        self.running = False
+
+    # What the core needs from the program it runs in (see Host)
+
+    def GetSetting(self, name, default):
+        return self.settings.get(name, default)
+
+    def Print(self, text):
+        self.connection.Send([0, "print", [text if isinstance(text, basestring) else str(text)]])
+
+    def TriggerUpdate(self):
+        self.queue.put("update")
+
+    def OpenFile(self, path):
+        self.connection.Send([0, "open", [path]])
+
+def _DescribeFile(f):
+    return [f.relativePath, f.project.definition.name, os.path.join(f.project.definition.absoluteDirPath, f.relativePath)]
+
+class _PrintForwarder:
+    """Stands in for sys.stdout, which the connection uses, so what the core
+    prints (e.g. projects that can't be read) is shown by the plugin"""
+    def __init__(self, server):
+        self.server = server
+        self.pending = ""
+
+    def write(self, text):
+        self.pending += text
+        while "\n" in self.pending:
+            line, self.pending = self.pending.split("\n", 1)
+            self.server.Print(line)
+
+    def flush(self):
+        pass
@@ -0,0 +1,330 @@
+import re
+import os.path
+import Queue
+from tree import Folder, TreeOption, TreeNode
+from project import ProjectDef, Project, ProjectConfiguration, ProjectContents
+from projectloader import ProjectLoader
+from parsecache import ParseCache
+from watcher import FileWatcher
+from dependencies import DependencyGraph, NormalizePath
+from host import Host
+
+# Lines of the .sln file we care about
+_formatVersionRegex = re.compile("Format Version (.*)")
+_projectRegex = re.compile("Project\(\"(?P<type>.*?)\"\)\s*=\s*\"(?P<name>.*?)\"\s*,\s*\"(?P<path>.*?)\"\s*,\s*\"(?P<uuid>.*?)\"")
+_sectionRegex = re.compile("GlobalSection\((.*?)\)")
+_projectSectionRegex = re.compile("ProjectSection\((.*?)\)")
+_solutionConfigRegex = re.compile("(.*?)\|(.*?)\s*=\s*.*")
+_projectConfigRegex = re.compile("(\{[A-Z0-9-]*?\})\.(.*?)\|(.*?)\.(.*?)\s*=\s*(.*?)\|(.*?)\s*$")
+_nestingRegex = re.compile("(\{[A-Z0-9-]*?\})\s*=\s*(\{[A-Z0-9-]*?\})")
+
+class Solution(Folder):
+    """Represents a VS solution (i.e. .sln file)"""
+
+    def __init__(self, path):
+        Folder.__init__(self, os.path.basename(path))
+        self.absolutePath = os.path.abspath(path)
+        self.solutionDir = os.path.dirname(path)
+
+        # Bumped whenever a project is loaded so anything built from the
+        # contents of the projects knows when it's out of date
+        self.generation = 0
+
+        # If anything goes wrong while reading the configuration/platform data
+        # buildable is set to False to indicate that we don't know how to
+        # build this solution. Building is up to whoever uses the solution
+        # (i.e. the plugin's Builder), it can keep itself in builder.
+        self.buildable = True
+        self.builder = None
+
+        # Reuse whatever was parsed the last time this solution was opened, as
+        # long as the files haven't changed since then (see ParseCache)
+        self.cache = ParseCache(self.absolutePath, Host.GetSetting("parse_cache", True))
+        if not self.cache.RestoreSolution(self):
+            if self.__ReadSolutionFile(path):
+                self.cache.StoreSolution(self)
+            else:
+                return
+
+        # Add the solution options to the hierarchy
+        self.configuration = TreeOption("Config  ", self.configurations, 0)
+        self.platform = TreeOption("Platform", self.platforms, 0)
+        self.AddChild(self.configuration)
+        self.AddChild(self.platform)
+
+        # So if everything went well while reading the sln, let's open the
+        # projects. The project files are read by the loader (see
+        # g:solvent_load_workers) but the tree is built right here. Projects
+        # whose files haven't changed are taken from the cache. With
+        # g:solvent_lazy_load the projects are only read when they're needed.
+        self.loader = ProjectLoader(Host.GetSetting("load_workers", 1), self.cache)
+        self._loadedQueue = Queue.Queue()
+        if Host.GetSetting("lazy_load", False):
+            # Solution folders have no file to read, they're loaded right away
+            contents = [ProjectContents() if d.type == "general" else None for d in self.projectDefs]
+        else:
+            contents = self.loader.ReadAll(self.projectDefs)
+            self.cache.Save()
+        self.projects = []
+        self._projectsByUUID = {}
+        for i in range(0, len(self.projectDefs)):
+            project = Project(self.projectDefs[i], contents[i], i)
+            self.projects.append(project)
+            self._projectsByUUID[project.definition.uuid] = project
+
+        # Now that the projects are loaded in a list, build the hierarchy
+        for p in self.projects:
+            if p.definition.parentuuid != None:
+                parent = self.GetProjectByUUID(p.definition.parentuuid)
+                parent.AddChild(p)
+            else:
+                self.AddChild(p)
+
+        # With g:solvent_watch the projects are read again when their files
+        # change (e.g. files added from Visual Studio or after a pull)
+        self.watcher = None
+        if Host.GetSetting("watch", True):
+            self.watcher = FileWatcher(Host.GetSetting("watch_interval", 2.0), self.__OnFileChanged)
+            self.watcher.Watch(self, [self.absolutePath])
+            for d in self.projectDefs:
+                if d.type == "cpp":
+                    self.watcher.Watch(d, [d.absolutePath + ".filters", d.absolutePath])
+
+    def Close(self):
+        """Stops watching the files of the solution and saves the cache if a
+        save is still pending (see ParseCache.SaveLater)"""
+        if getattr(self, "watcher", None) != None:
+            self.watcher.Close()
+            self.watcher = None
+        if getattr(self, "cache", None) != None:
+            self.cache.Flush()
+
+    def __OnFileChanged(self, key):
+        """Called from the watcher's background thread"""
+        if key is self:
+            # Projects might have been added, removed or moved around
+            Host.Print("The solution file changed, run :Dissolve to open it again")
+            return
+
+        # Projects that weren't loaded yet will be read when they're needed
+        if self.GetProjectByUUID(key.uuid).pending:
+            return
+        contents = ProjectContents.Read(key)
+        self.cache.StoreProject(key, contents)
+        self._loadedQueue.put((key, contents, True))
+        Host.TriggerUpdate()
+
+    def LoadProjects(self, projects, wait=False):
+        """Loads the given projects if they haven't been loaded yet (see
+        g:solvent_lazy_load). Unless wait is True the project files are read
+        in the background and the projects are loaded later by UpdateAsync"""
+        if wait:
+            projects = [p for p in projects if p.pending]
+            contents = self.loader.ReadAll([p.definition for p in projects])
+            for i in range(0, len(projects)):
+                projects[i].Load(contents[i])
+            self.cache.SaveLater()
+        else:
+            projects = [p for p in projects if p.pending and not p.loading]
+            for p in projects:
+                p.loading = True
+            self.loader.ReadInBackground([p.definition for p in projects], self.__OnProjectRead)
+
+    def __OnProjectRead(self, definition, contents):
+        """Called from the loader's background thread"""
+        self._loadedQueue.put((definition, contents, False))
+        Host.TriggerUpdate()
+
+    def UpdateAsync(self):
+        """Loads the projects that were read in the background, either for the
+        first time or because their files changed. Returns the list of
+        projects that were (re)loaded"""
+        loaded = []
+        try:
+            while True:
+                definition, contents, changed = self._loadedQueue.get_nowait()
+                project = self.GetProjectByUUID(definition.uuid)
+                # It might have been loaded in the meantime (see LoadProjects)
+                if project.pending:
+                    project.Load(contents)
+                    loaded.append(project)
+                elif changed:
+                    # Its files changed since it was loaded (see __OnFileChanged)
+                    project.Reload(contents)
+                    loaded.append(project)
+        except Queue.Empty:
+            pass
+        if loaded:
+            self.cache.SaveLater()
+        return loaded
+
+    def __ReadSolutionFile(self, path):
+        """Reads the project definitions and configuration data from the .sln
+        file. The file is read line by line in a single pass, lines inside a
+        GlobalSection are handed to the reader of that section. Returns False
+        if the solution can't be used"""
+        try:
+            content_file = open(path, 'r')
+        except Exception as e:
+            print "The solution file could not be read. Aborting."
+            print e
+            return False
+
+        self.formatVersion = None
+        self.projectDefs = []
+        self.configurations = []
+        self.platforms = []
+        self._projectDefsByUUID = {}
+
+        sectionReaders = {
+            "SolutionConfigurationPlatforms": self.__ReadSolutionConfig,
+            "ProjectConfigurationPlatforms": self.__ReadProjectConfig,
+            "NestedProjects": self.__ReadNesting,
+            }
+
+        with content_file:
+            section = None          # Name of the GlobalSection we're in, if any
+            definition = None       # Last project read
+            projectSection = None   # Name of the ProjectSection of that project we're in, if any
+            for line in content_file:
+                line = line.strip()
+
+                if section != None:
+                    if line == "EndGlobalSection":
+                        section = None
+                    elif section in sectionReaders:
+                        try:
+                            sectionReaders[section](line)
+                        except Exception as e:
+                            self.buildable = False      # Disable building
+                            if section == "SolutionConfigurationPlatforms":
+                                print ("Configuration data could not be read from the .sln file, the solution won't be buildable from Vim:")
+                            else:
+                                print ("Project configuration data could not be read from the .sln file, the solution won't be buildable from Vim:")
+                            print e
+                            return False
+
+                elif projectSection != None:
+                    if line == "EndProjectSection":
+                        projectSection = None
+                    elif projectSection == "ProjectDependencies":
+                        m = _nestingRegex.match(line)
+                        if m != None:
+                            definition.dependencies.append(m.group(1))
+
+                elif line.startswith("ProjectSection(") and definition != None:
+                    projectSection = _projectSectionRegex.match(line).group(1)
+
+                elif line.startswith("Project("):
+                    try:
+                        m = _projectRegex.match(line)
+                        # print m.group("type") + ": " + m.group("name") + ", " + m.group("path") + ", " + m.group("uuid")
+                        definition = ProjectDef(self, m.group("type"), m.group("name"), m.group("path"), m.group("uuid"))
+                    except Exception as e:
+                        print ("The projects in the solution are not in the expected format, please send the solution file to juancampa "
+                              "at gmail dot com so the plugin can be enhanced, thanks! Aborting. Also please include the following error:")
+                        print e
+                        return False
+                    self.projectDefs.append(definition)
+                    self._projectDefsByUUID[definition.uuid] = definition
+
+                elif line.startswith("GlobalSection("):
+                    section = _sectionRegex.match(line).group(1)
+
+                elif self.formatVersion == None:
+                    # Find out the version of the solution
+                    m = _formatVersionRegex.search(line)
+                    if m != None:
+                        self.formatVersion = m.group(1)
+
+        if self.formatVersion == None:
+            print "The solution file doesn't seem to have valid solution contents. Aborting."
+            return False
+
+        return True
+
+    def __ReadSolutionConfig(self, line):
+        """Reads a line of the SolutionConfigurationPlatforms section"""
+        m = _solutionConfigRegex.match(line)
+        if m == None:
+            return
+        config = m.group(1)
+        plat = m.group(2)
+
+        if not config in self.configurations:
+            self.configurations.append(config)
+        if not plat in self.platforms:
+            self.platforms.append(plat)
+
+    def __ReadProjectConfig(self, line):
+        """Reads a line of the ProjectConfigurationPlatforms section. This is
+        the most bizarre part of an sln file the value after the Build.0
+        doesn't really mean anything. But if a "Build.0" exists is because the
+        project is selected to be built under the solution configuration"""
+        m = _projectConfigRegex.match(line)
+        if m == None:
+            return
+        projectUUID, solutionConfig, solutionPlatform, prop, projectConfig, projectPlatform = m.groups()
+
+        projectDef = self.GetProjectDefByUUID(projectUUID)
+        if projectDef != None:
+            config = projectDef.GetOrCreateConfig(solutionConfig, solutionPlatform)
+            if "ActiveCfg" in prop:
+                config.SetProjectConfig(projectConfig, projectPlatform)
+            elif "Build.0" in prop:
+                config.Enable()
+
+    def __ReadNesting(self, line):
+        """Reads a line of the NestedProjects section"""
+        m = _nestingRegex.match(line)
+        if m == None:
+            return
+        child = self.GetProjectDefByUUID(m.group(1))
+        if child != None:
+            child.parentuuid = m.group(2)
+
+    def FindProjectOfFile(self, path):
+        """Returns the Project that has the file at the given path or None if
+        no project has it. All projects are loaded if they weren't yet"""
+        self.LoadProjects(self.projects, wait=True)
+        if getattr(self, "_projectsByFileKey", None) != self.generation:
+            self._projectsByFile = {}
+            for p in self.projects:
+                for f in p.files:
+                    self._projectsByFile[NormalizePath(os.path.join(p.definition.absoluteDirPath, f.relativePath))] = p
+            self._projectsByFileKey = self.generation
+        return self._projectsByFile.get(NormalizePath(path))
+
+    def GetAffected(self, path):
+        """The ProjectDefs BuildAffected would build for the file at path in
+        waves (see DependencyGraph.Waves), None if no project has the file"""
+        project = self.FindProjectOfFile(path)
+        if project == None:
+            return None
+        graph = self.GetDependencyGraph()
+        waves = graph.Waves(graph.Dependents([project.definition.uuid]))
+        return [[self.GetProjectDefByUUID(u) for u in wave] for wave in waves]
+
+    def RequestAffected(self, path, callback):
+        """Calls callback with what GetAffected returns. It's called right
+        away here, a RemoteSolution calls it once the model server answers"""
+        callback(self.GetAffected(path))
+
+    def GetDependencyGraph(self):
+        """Returns the DependencyGraph of the projects as they are now"""
+        graph = DependencyGraph(self)
+        self.cache.SaveLater()  # The project references are cached too
+        return graph
+
+    def GetNodeName(self):
+        return "[%s]" % self.name
+
+    def GetProjectDefByUUID(self, uuid):
+        return self._projectDefsByUUID.get(uuid)
+
+    def GetProjectByUUID(self, uuid):
+        return self._projectsByUUID.get(uuid)
+
+    def IndentsChildren(self):
+        return False
+
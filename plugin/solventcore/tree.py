@@ -0,0 +1,154 @@
+import os.path
+from host import Host
+
+# TODO: rename this to TreeAction?
+class Actions:
+    """Actions that can be performed on the solution view and can be mapped to a key"""
+    Expand                  = 1
+    Collapse                = 2
+    ExpandOrCollapse        = 3
+    ExpandAll               = 4
+    CollapseAll             = 5
+    ExpandOrCollapseAll     = 6
+    ExpandDescendants       = 7
+    CollapseDescendants     = 8
+    OpenFile                = 9
+    OpenFileInVertSplit     = 10
+    OpenFileInHoriSplit     = 11
+    ToggleOption            = 12
+
+_internedUnicode = {}
+
+def InternString(s):
+    """Returns a shared copy of the string so equal paths and filter names
+    read from different items take memory only once. intern() only takes
+    byte strings so unicode ones are kept in a table instead"""
+    if s == None:
+        return s
+    try:
+        return intern(s)
+    except TypeError:
+        return _internedUnicode.setdefault(s, s)
+
+class TreeNode(object):
+    """Base class for all elements on the tree. Nodes use __slots__ instead
+    of a __dict__ since big solutions have hundreds of thousands of them"""
+    __slots__ = ("parent",)
+
+    # Leaves (e.g. files) share these, nodes that can have children (see
+    # Folder) have their own
+    children = ()
+    expanded = False
+
+    def __init__(self):
+        self.parent = None
+
+    def GetNodeName(self):
+        pass
+
+    def GetChildByName(self, name):
+        return None
+
+    def HasChildren(self):
+        """Whether the node has (or could have) children to show when it's expanded"""
+        return len(self.children) > 0
+
+    def IndentsChildren(self):
+        return True
+
+    def PerformAction(self, action):
+        pass
+
+class Folder(TreeNode):
+    """Base class for folders in the tree"""
+    __slots__ = ("name", "children", "expanded", "_childrenByName")
+
+    def __init__(self, name):
+        TreeNode.__init__(self)
+        self.name = name
+        self.children = []
+        self.expanded = True
+
+        # Index of the children by name, it's kept in sync with children by
+        # AddChild/RemoveChild. Names are taken when the child is added so it's
+        # only reliable for nodes whose name doesn't change (e.g. folders and files).
+        self._childrenByName = {}
+
+    def GetNodeName(self):
+        return self.name
+
+    def AddChild(self, child):
+        """Appends a child keeping the name index up to date"""
+        self.children.append(child)
+        child.parent = self
+        # If several children share a name the first one is found (same as a linear search would)
+        self._childrenByName.setdefault(child.GetNodeName(), child)
+
+    def RemoveChild(self, child):
+        self.children.remove(child)
+        child.parent = None
+        name = child.GetNodeName()
+        if self._childrenByName.get(name) is child:
+            del self._childrenByName[name]
+            # Another child with the same name might be there
+            for c in self.children:
+                if c.GetNodeName() == name:
+                    self._childrenByName[name] = c
+                    break
+
+    def RemoveAllChildren(self):
+        for c in self.children:
+            c.parent = None
+        self.children = []
+        self._childrenByName = {}
+
+    def GetChildByName(self, name):
+        return self._childrenByName.get(name)
+
+    def PerformAction(self, action):
+        if action == Actions.Expand: self.expanded = True
+        if action == Actions.Collapse: self.expanded = False
+        if action == Actions.ExpandOrCollapse: self.expanded = not self.expanded
+
+class File(TreeNode):
+    """Represents a single file in the tree"""
+    __slots__ = ("project", "relativePath")
+
+    def __init__(self, project, relativePath):
+        TreeNode.__init__(self)
+        self.project = project
+        self.relativePath = InternString(relativePath)
+
+    @property
+    def filename(self):
+        # Not stored since it's part of relativePath anyway
+        return os.path.basename(self.relativePath)
+
+    def GetNodeName(self):
+        return self.filename
+
+    def PerformAction(self, action):
+        if action == Actions.OpenFile:
+            Host.OpenFile(os.path.join(self.project.definition.absoluteDirPath, self.relativePath))
+
+
+class TreeOption(TreeNode):
+    """Elements on the tree that represent an option (e.g. Platform, Config, etc)"""
+    __slots__ = ("selectedIndex", "options", "name")
+
+    def __init__(self, name, optionList, selectedIndex=0):
+        TreeNode.__init__(self)
+        self.selectedIndex = selectedIndex 
+        self.options = optionList
+        self.name = name
+
+    def PerformAction(self, action):
+        if action == Actions.ToggleOption:
+            self.selectedIndex = (self.selectedIndex + 1) % len(self.options)
+
+    def GetSelected(self):
+        return self.options[self.selectedIndex];
+
+    def GetNodeName(self):
+        return self.name + ":" + self.GetSelected();
+
@@ -0,0 +1,197 @@
+import itertools
+from tree import Actions, TreeOption
+
+class TreeLines:
+    """Flattened model of the visible lines of a tree, what the tree view
+    shows. Item i of nodes and depths belongs to line i + 1 of the view, the
+    first line is always empty so it has no node.
+
+    The line of a node is looked up in a node -> line map (see GetLine)
+    instead of searching nodes. When lines are added or removed the lines
+    after them move, so the map is only right up to _linesValid and it's
+    brought up to date from there the next time it's needed"""
+
+    def __init__(self, root):
+        self.root = root
+        self.nodes = [None]
+        self.depths = [0]
+        self._lines = {}
+        self._linesValid = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def Flatten(self, text=True):
+        """Flattens the whole tree again, returns the text of every line
+        unless text is False"""
+        self.nodes = [None]
+        self.depths = [0]
+        self._lines = {}
+        self._linesValid = 0
+        lines = [""] if text else None
+        self.__Flatten(self.root, 0, self.nodes, self.depths, lines)
+        return lines
+
+    def GetLine(self, node):
+        """Index of the line of the node, None if it's not visible"""
+        index = self._lines.get(node)
+        if index == None or index >= self._linesValid:
+            if self._linesValid < len(self.nodes):
+                count = len(self.nodes)
+                self._lines.update(itertools.izip(self.nodes[self._linesValid:], xrange(self._linesValid, count)))
+                self._linesValid = count
+            index = self._lines.get(node)
+        return index
+
+    def FlattenNode(self, node, oldLineCount, text=True, index=None):
+        """Flattens again only the lines of the given node and its visible
+        descendants. oldLineCount is the number of lines the node took the
+        last time it was flattened (see CountLines), those lines are
+        replaced by the new ones and the following lines are just shifted.
+        Returns (start, end, lines) meaning lines start to end of the old
+        ones are now the given lines (their number if text is False), or
+        None if the node isn't visible. index is the node's line if the
+        caller knows it"""
+        if index == None:
+            index = self.GetLine(node)
+            if index == None:
+                return None     # Not visible, nothing changes
+
+        nodes = []
+        depths = []
+        lines = [] if text else None
+        self.__Flatten(node, self.depths[index], nodes, depths, lines)
+
+        end = index + oldLineCount
+        for n in self.nodes[index:end]:
+            self._lines.pop(n, None)
+        self.nodes[index:end] = nodes
+        self.depths[index:end] = depths
+
+        # The lines before index didn't move, the ones after did unless as
+        # many lines were added as removed
+        if len(nodes) == oldLineCount and index + len(nodes) <= self._linesValid:
+            self._lines.update(itertools.izip(nodes, xrange(index, end)))
+        else:
+            self._linesValid = min(self._linesValid, index)
+        return (index, end, lines if text else len(nodes))
+
+    def FlattenReloaded(self, nodes, text=True):
+        """FlattenNode for nodes whose children were replaced (e.g. projects
+        loaded in the background), the lines they took are the ones flattened
+        before. Returns the changes to apply in order, nodes lower in the tree
+        go first so the lines of the ones above them don't move"""
+        lines = [(self.GetLine(n), n) for n in nodes]
+        changes = []
+        for index, node in sorted([l for l in lines if l[0] != None], reverse=True):
+            changes.append(self.FlattenNode(node, self.__CountFlattenedLines(index), text, index))
+        return changes
+
+    def RenderLine(self, index):
+        """Returns the text of the given line"""
+        node = self.nodes[index]
+        if node == None:
+            return ""
+        return self.__RenderLine(node, self.depths[index])
+
+    def __RenderLine(self, node, depth):
+        # Render the expand symbold (TODO: move this to be part of the node?)
+        if node.HasChildren():
+            if node.expanded:
+                statusSym = "-"
+            else:
+                statusSym = "+"
+        else:
+            statusSym = " "
+
+        indent = " " * depth
+        return indent + statusSym + node.GetNodeName()
+
+    def __Flatten(self, node, depth, nodes, depths, lines):
+        """Appends the node and its visible descendants to the given lists,
+        lines can be None if the text of the lines is not needed"""
+        nodes.append(node)
+        depths.append(depth)
+        if lines != None:
+            lines.append(self.__RenderLine(node, depth))
+
+        if node.expanded:
+            childDepth = depth + 1 if node.IndentsChildren() else depth
+            for child in node.children:
+                self.__Flatten(child, childDepth, nodes, depths, lines)
+
+    def CountLines(self, node):
+        """Number of lines the node and its visible descendants take"""
+        count = 1
+        if node.expanded:
+            for child in node.children:
+                count += self.CountLines(child)
+        return count
+
+    def __CountFlattenedLines(self, index):
+        """Number of lines the node of the given line and its descendants
+        took the last time they were flattened (the node must indent its
+        children), e.g. for a project whose children are gone after it was
+        loaded again"""
+        depth = self.depths[index]
+        end = index + 1
+        while end < len(self.depths) and self.depths[end] > depth:
+            end += 1
+        return end - index
+
+    def PerformAction(self, index, action, text=True):
+        """Performs the action on the node of the given line (none if index
+        is out of range) and flattens what changed again. Returns what
+        FlattenNode does when only the lines of that node changed, (0, old
+        number of lines, lines) when the whole tree was flattened again, or
+        None if no line changed (e.g. a file was opened)"""
+        selected = self.nodes[index] if 0 <= index < len(self.nodes) else None
+        if selected != None:
+            # Only the lines of the selected node can change when it's
+            # expanded or collapsed so keep track of how many it has now
+            oldLineCount = self.CountLines(selected)
+            expanded = selected.expanded
+
+            selected.PerformAction(action)
+
+            # Actions that apply to all descendants of the selected node
+            if action == Actions.ExpandDescendants:
+                self.__PerformInDescendants(selected, Actions.Expand)
+            if action == Actions.CollapseDescendants:
+                self.__PerformInDescendants(selected, Actions.Collapse)
+
+            if action in (Actions.Expand, Actions.Collapse, Actions.ExpandOrCollapse):
+                if selected.expanded == expanded:
+                    return None     # Already was, or it can't be (e.g. a file)
+                return self.FlattenNode(selected, oldLineCount, text, index)
+            if action in (Actions.ExpandDescendants, Actions.CollapseDescendants):
+                return self.FlattenNode(selected, oldLineCount, text, index)
+
+        # Only the actions on all nodes and toggling an option (the names of
+        # the projects depend on the selected configuration and platform)
+        # change more than the selected node, anything else (e.g. opening a
+        # file) didn't change a line
+        toggled = action == Actions.ToggleOption and isinstance(selected, TreeOption)
+        if not toggled and action not in (Actions.ExpandAll, Actions.CollapseAll, Actions.ExpandOrCollapseAll):
+            return None
+
+        # Actions that apply to all nodes
+        if action == Actions.ExpandAll:
+            for n in self.nodes[1:]:
+                n.PerformAction(Actions.Expand)
+        if action == Actions.CollapseAll:
+            for n in self.nodes[1:]:
+                n.PerformAction(Actions.Collapse)
+        if action == Actions.ExpandOrCollapseAll:
+            for n in self.nodes[1:]:
+                n.PerformAction(Actions.ExpandOrCollapse)
+
+        # Flatten again because something probably changed
+        end = len(self.nodes)
+        lines = self.Flatten(text)
+        return (0, end, lines if text else len(self.nodes))
+
+    def __PerformInDescendants(self, node, action):
+        node.PerformAction(action)
+        for c in node.children:
+            self.__PerformInDescendants(c, action)
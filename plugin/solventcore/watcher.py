@@ -0,0 +1,47 @@
+import threading
+from parsecache import ParseCache
+
+class FileWatcher:
+    """Polls the mtime and size of groups of files from a background thread
+    and calls onchanged (from that thread) with the key of each group whose
+    files changed. Polling is the only way that works everywhere and it's
+    cheap enough for the few thousand files of a big solution"""
+    def __init__(self, interval, onchanged):
+        self.interval = interval
+        self.onchanged = onchanged
+        self._watched = {}      # key -> (paths, stamps)
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        self.thread = threading.Thread(target=self.__Poll)
+        self.thread.daemon = True    # So this thread dies with vim
+        self.thread.start()
+
+    def Watch(self, key, paths):
+        """Starts watching the files, changes are relative to their state now"""
+        stamps = [ParseCache.Stamp(p) for p in paths]
+        with self._lock:
+            self._watched[key] = (paths, stamps)
+
+    def Unwatch(self, key):
+        with self._lock:
+            self._watched.pop(key, None)
+
+    def Close(self):
+        self._closed.set()
+
+    def __Poll(self):
+        while not self._closed.wait(self.interval):
+            with self._lock:
+                watched = self._watched.items()
+
+            for key, (paths, stamps) in watched:
+                current = [ParseCache.Stamp(p) for p in paths]
+                if current == stamps:
+                    continue
+                with self._lock:
+                    # Only if it's still watched and nobody changed it meanwhile
+                    if self._watched.get(key, (None, None))[1] is not stamps:
+                        continue
+                    self._watched[key] = (paths, current)
+                self.onchanged(key)
@@ -1,8 +1,11 @@
 import vim
+import os.path
 import threading
 import subprocess
 import tempfile
+import socket
 import sets
+from solventcore.host import Host
 
 class MapScopes:
     Normal = 1
@@ -13,6 +16,11 @@ class MapScopes:
     AllButInsert = Select | Visual | Normal
 
 class VimUtil:
+    # The solution the plugin has open (see Solvent.UseSolution). It's kept
+    # here since every :Dissolve runs solvent.py again, which starts over
+    # with a brand new Solvent class, but this module is only imported once
+    solution = None
+
     @staticmethod
     def Init():
         """Must be called by the plugin during init"""
@@ -24,10 +32,52 @@ class VimUtil:
         # Set of buffer names that belong to the plugin
         VimUtil._pluginbuffers = sets.Set()
 
+        # How other threads get vim to call UpdateAsync. Depending on the
+        # features of this vim it's a channel (the best choice), a timer or
+        # another vim process talking to this one through clientserver.
+        if getattr(VimUtil, "_waker", None) != None:
+            VimUtil._waker.Close()
+        VimUtil._updatepending = False
+        VimUtil._waker = VimUtil.__CreateWaker(VimUtil.GetSetting("wakeup", ""))
+
+        # The core (settings, messages, opening files...) goes through vim
+        Host.Use(VimUtil)
+
+    @staticmethod
+    def __CreateWaker(kind):
+        if kind == "":
+            if vim.eval("has('channel')") == "1":
+                kind = "channel"
+            elif vim.eval("has('timers')") == "1":
+                kind = "timer"
+            else:
+                kind = "server"
+
+        if kind == "channel":
+            return _ChannelWaker()
+        if kind == "timer":
+            return _TimerWaker(VimUtil.GetSetting("poll_interval", 50))
+        return _ServerWaker()
+
     @staticmethod
     def DeclarePluginBuffer(name):
         VimUtil._pluginbuffers.add(name)
 
+    @staticmethod
+    def GetSetting(name, default):
+        """Returns the value of the g:solvent_<name> variable converted to the
+        type of the default value, or default if the user hasn't defined it"""
+        var = "g:solvent_" + name
+        if vim.eval("exists('%s')" % var) == "0":
+            return default
+        value = vim.eval(var)
+        if isinstance(default, bool):
+            return value not in ("", "0")
+        try:
+            return type(default)(value)
+        except (TypeError, ValueError):
+            return default
+
     @staticmethod
     def ConstructPlusCmd(commands):
         """Returns a correctly formatted +cmd string (see :help +cmd)"""
@@ -74,38 +124,131 @@ class VimUtil:
     @staticmethod
     def UpdateAsync():
         with VimUtil._lock:
-            # Print any pending prints
-            for i in VimUtil._printbuffer:
-                print i
-            del VimUtil._printbuffer[:]
+            # Anything that comes in from now on needs another wakeup
+            VimUtil._updatepending = False
+            printbuffer = VimUtil._printbuffer
+            VimUtil._printbuffer = []
+            components = list(VimUtil._asynccomponents)
 
-            # Update any async components
-            for c in VimUtil._asynccomponents:
-                c.UpdateAsync()
+        # Print any pending prints
+        for i in printbuffer:
+            print i
+
+        # Update any async components
+        for c in components:
+            c.UpdateAsync()
 
         return 0
 
     @staticmethod
     def TriggerUpdate():
-        """This method should be called whenever a thread wants the main thread to call UpdateAsync"""
-        servername = vim.eval("v:servername")
-        startupinfo = subprocess.STARTUPINFO()
-        if subprocess.mswindows:
-            startupinfo.dwFlags = 0x00000010 | 0x00000001 # CREATE_NEW_CONSOLE | STARTF_USESHOWWINDOW
-            startupinfo.wShowWindow = 0x00000000 # SW_HIDE
+        """This method should be called whenever a thread wants the main thread
+        to call UpdateAsync. It can be called from any thread, calls made
+        before the main thread gets to run UpdateAsync are merged into one"""
+        with VimUtil._lock:
+            if VimUtil._updatepending:
+                return
+            VimUtil._updatepending = True
+        VimUtil._waker.Wake()
 
-        outfile = tempfile.TemporaryFile(mode="w")
-        errfile = tempfile.TemporaryFile(mode="w")
-        infile = tempfile.TemporaryFile(mode="r")
-        subprocess.Popen(["vim", "--servername", "" + servername + "", "--remote-expr", "pyeval(\"VimUtil.UpdateAsync()\")"], shell=False, stdout=outfile, stderr=errfile, stdin=infile, startupinfo=startupinfo) 
+    @staticmethod
+    def PollUpdate():
+        """Called periodically by vim when a timer is used to wake it up"""
+        if VimUtil._updatepending:
+            VimUtil.UpdateAsync()
 
-        # TODO: should we delete the tempfiles? 
-        # TODO: should we reuse them?
+    @staticmethod
+    def OpenFile(path):
+        """Opens the file in the last window that wasn't one of the plugin's"""
+        if vim.current.window != None and vim.current.window.valid:
+            vim.current.window = VimUtil.lastWindow
+        vim.command("edit " + path)
 
     @staticmethod
     def OnWinLeave():
         # Keep the last window so when a file is opened we open it there but 
         # don't use our own windows to open files of course.
-        if vim.current.window.buffer.name not in VimUtil._pluginbuffers:
+        if os.path.basename(vim.current.window.buffer.name) not in VimUtil._pluginbuffers:
             VimUtil.lastWindow = vim.current.window
 
+class _ChannelWaker:
+    """Wakes up vim by writing to a local socket that vim has opened as a
+    channel, the channel's callback calls UpdateAsync"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self._early = False     # Whether Wake was called before vim connected
+
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen(1)
+
+        thread = threading.Thread(target=self.__Accept)
+        thread.daemon = True    # So this thread dies with vim
+        thread.start()
+
+        # The connection is queued by the listening socket so this doesn't
+        # need to wait for the thread to accept it
+        vim.command("let g:solvent_wakeup_channel = ch_open('127.0.0.1:%d', {'mode': 'raw', 'callback': 'SolventWakeup'})" % self._server.getsockname()[1])
+
+    def __Accept(self):
+        try:
+            connection, address = self._server.accept()
+        except socket.error:
+            return      # Closed before vim connected
+        with self._lock:
+            self._connection = connection
+            if self._early:
+                self.__Send()
+
+    def __Send(self):
+        try:
+            self._connection.sendall("\n")
+        except socket.error:
+            pass
+
+    def Wake(self):
+        with self._lock:
+            if self._connection == None:
+                self._early = True
+            else:
+                self.__Send()
+
+    def Close(self):
+        vim.command("silent! call ch_close(g:solvent_wakeup_channel)")
+        with self._lock:
+            if self._connection != None:
+                self._connection.close()
+        self._server.close()
+
+class _TimerWaker:
+    """Has a vim timer poll for pending updates (see VimUtil.PollUpdate)"""
+    def __init__(self, interval):
+        vim.command("let g:solvent_wakeup_timer = timer_start(%d, 'SolventPoll', {'repeat': -1})" % interval)
+
+    def Wake(self):
+        pass    # The timer will see the update is pending
+
+    def Close(self):
+        vim.command("silent! call timer_stop(g:solvent_wakeup_timer)")
+
+class _ServerWaker:
+    """Starts another vim process that asks this one to call UpdateAsync
+    through clientserver (for vims without channels or timers)"""
+    def __init__(self):
+        self._servername = vim.eval("v:servername")
+
+    def Wake(self):
+        startupinfo = None
+        if subprocess.mswindows:
+            startupinfo = subprocess.STARTUPINFO()
+            startupinfo.dwFlags = 0x00000010 | 0x00000001 # CREATE_NEW_CONSOLE | STARTF_USESHOWWINDOW
+            startupinfo.wShowWindow = 0x00000000 # SW_HIDE
+
+        outfile = tempfile.TemporaryFile(mode="w")
+        errfile = tempfile.TemporaryFile(mode="w")
+        infile = tempfile.TemporaryFile(mode="r")
+        subprocess.Popen(["vim", "--servername", "" + self._servername + "", "--remote-expr", "pyeval(\"VimUtil.UpdateAsync()\")"], shell=False, stdout=outfile, stderr=errfile, stdin=infile, startupinfo=startupinfo) 
+
+    def Close(self):
+        pass
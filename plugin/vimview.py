@@ -32,6 +32,9 @@ class View:
                 if saved.valid:                    # We might have closed the saved
                     vim.current.window = saved
 
+        # So files are never opened in this window (see VimUtil.OnWinLeave)
+        VimUtil.DeclarePluginBuffer(self.bufferName)
+
         self.buffer, self.window = self.FindBufferAndWindow()
         if not self.window or not self.window.valid:
             wrap = "wrap" if self.wrap else "nowrap"